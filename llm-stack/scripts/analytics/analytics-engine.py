@@ -4,12 +4,13 @@ Advanced Analytics Engine for LLM Stack
 Provides comprehensive analytics, insights, and business intelligence from RAG index data.
 
 Usage:
-    python analytics-engine.py [--index-dir rag-index/] [--output-dir analytics-output/]
+    python analytics-engine.py [--index-dir rag-index/] [--output-dir analytics-output/] [--formats json,html,png]
 """
 
 import json
-import jsonlines
+import orjson
 import argparse
+import os
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -17,17 +18,107 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as paj
+import pyarrow.parquet as pq
 from collections import Counter, defaultdict
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from concurrent.futures import ProcessPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Optional JIT acceleration for keyword counting
+try:
+    from numba import njit
+    from numba import types as numba_types
+    from numba.typed import Dict as NumbaDict
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Low-cardinality columns stored dictionary-encoded (categorical) after load
+CATEGORICAL_COLUMNS = ('source', 'type', 'language')
+JSONL_BLOCK_SIZE = 32 << 20
+
+# Output formats selectable with --formats: report (JSON + markdown summary), Plotly HTML, matplotlib PNG
+OUTPUT_FORMATS = ('json', 'html', 'png')
+
+# orjson serializes NumPy values natively, so metrics need no int()/tolist() casts
+REPORT_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Parsed exports are cached next to the index and reused while the source is unchanged
+PARQUET_CACHE_NAME = "analytics-cache.parquet"
+
+# Top-level text fields have fixed types; pinning them skips inference and keeps
+# extracted_at a string even when a block happens to look like timestamps. id is left
+# to inference because exporters emit it as either a string or an integer
+DOCUMENT_SCHEMA = pa.schema([
+    ('source', pa.string()),
+    ('type', pa.string()),
+    ('title', pa.string()),
+    ('content', pa.string()),
+    ('extracted_at', pa.string()),
+])
+
+# Common stop words excluded from keyword analysis
+STOP_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+# Below this corpus size the JIT compile outweighs the pure-Python Counter pass
+NUMBA_MIN_BYTES = 4 << 20
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _count_ascii_tokens(data, min_length):
+        """Count whitespace-separated ASCII tokens case-insensitively by FNV-1a hash.
+        
+        Returns per-token counts plus the offset and length of each token's first
+        occurrence so callers can decode the winners.
+        """
+        counts = NumbaDict.empty(key_type=numba_types.int64, value_type=numba_types.int64)
+        first_start = NumbaDict.empty(key_type=numba_types.int64, value_type=numba_types.int64)
+        first_length = NumbaDict.empty(key_type=numba_types.int64, value_type=numba_types.int64)
+        n = data.shape[0]
+        i = 0
+        while i < n:
+            c = data[i]
+            # Same ASCII whitespace set as str.split(): \t-\r, \x1c-\x1f and space
+            if c == 32 or (9 <= c <= 13) or (28 <= c <= 31):
+                i += 1
+                continue
+            start = i
+            h = np.uint64(14695981039346656037)
+            while i < n:
+                c = data[i]
+                if c == 32 or (9 <= c <= 13) or (28 <= c <= 31):
+                    break
+                if 65 <= c <= 90:
+                    c = c | 0x20
+                h = (h ^ np.uint64(c)) * np.uint64(1099511628211)
+                i += 1
+            if i - start < min_length:
+                continue
+            key = np.int64(h)
+            if key in counts:
+                counts[key] += 1
+            else:
+                counts[key] = 1
+                first_start[key] = start
+                first_length[key] = i - start
+        
+        size = len(counts)
+        out_counts = np.empty(size, dtype=np.int64)
+        out_starts = np.empty(size, dtype=np.int64)
+        out_lengths = np.empty(size, dtype=np.int64)
+        j = 0
+        for key, count in counts.items():
+            out_counts[j] = count
+            out_starts[j] = first_start[key]
+            out_lengths[j] = first_length[key]
+            j += 1
+        return out_counts, out_starts, out_lengths
+
 class LLMStackAnalytics:
     def __init__(self, index_dir: str = "rag-index", output_dir: str = "analytics-output"):
         self.index_dir = Path(index_dir)
@@ -35,11 +126,26 @@ class LLMStackAnalytics:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize data containers
-        self.documents_df = None
+        self.table: Optional[pa.Table] = None
+        self._documents_df = None
+        self._content_lengths: Optional[pa.Array] = None
+        self._null_counts: Dict[str, int] = {}
+        self._insights_cache: Optional[Dict[str, Any]] = None
+        self._source_type_counts: Optional[List[Tuple[Any, Any, int]]] = None
         self.analytics_data = {}
         
         logger.info(f"Initialized analytics engine with index: {index_dir}")
     
+    @property
+    def documents_df(self) -> Optional[pd.DataFrame]:
+        """Pandas view of the loaded table, only materialized on first access"""
+        if self._documents_df is None and self.table is not None:
+            # Dictionary columns fall through to pandas Categorical; the rest stay Arrow-backed
+            self._documents_df = self.table.to_pandas(
+                types_mapper=lambda arrow_type: None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+            )
+        return self._documents_df
+    
     def load_rag_data(self) -> bool:
         """Load data from RAG index and JSONL files"""
         try:
@@ -55,21 +161,36 @@ class LLMStackAnalytics:
             
             # Load original JSONL data if available
             export_dir = self.index_dir.parent.parent / "export" / "exports"
+            jsonl_files = []
             if export_dir.exists():
-                jsonl_files = list(export_dir.glob("*.jsonl"))
-            else:
-                jsonl_files = []
+                # One stat per entry, reused for the newest-file selection
+                with os.scandir(export_dir) as entries:
+                    jsonl_files = [(entry.stat().st_mtime, entry.path) for entry in entries
+                                   if entry.name.endswith('.jsonl') and entry.is_file()]
             if jsonl_files:
-                latest_file = max(jsonl_files, key=lambda x: x.stat().st_mtime)
+                latest_file = Path(max(jsonl_files)[1])
                 logger.info(f"Loading data from: {latest_file}")
                 
-                documents = []
-                with jsonlines.open(latest_file) as reader:
-                    for obj in reader:
-                        documents.append(obj)
+                table = self._read_parquet_cache(latest_file)
+                if table is None:
+                    table = self._parse_jsonl(latest_file)
+                    self._write_parquet_cache(table, latest_file)
                 
-                self.documents_df = pd.DataFrame(documents)
-                logger.info(f"Loaded {len(self.documents_df)} documents for analysis")
+                # Chunks are encoded independently; group_by needs one shared dictionary
+                self.table = table.unify_dictionaries()
+                self._documents_df = None
+                self._insights_cache = None
+                self._source_type_counts = None
+                
+                # Several metrics need content lengths; measure the largest column once
+                if 'content' in self.table.column_names:
+                    self._content_lengths = pc.utf8_length(self.table['content']).combine_chunks()
+                else:
+                    self._content_lengths = None
+                
+                # Null counts come from Arrow validity bitmaps, no boolean mask needed
+                self._null_counts = {name: self.table[name].null_count for name in self.table.column_names}
+                logger.info(f"Loaded {self.table.num_rows} documents for analysis")
                 return True
             else:
                 logger.warning("No JSONL export files found")
@@ -79,16 +200,134 @@ class LLMStackAnalytics:
             logger.error(f"Failed to load RAG data: {e}")
             return False
     
+    def _parse_jsonl(self, jsonl_file: Path) -> pa.Table:
+        """Parse a JSONL export into an Arrow table with categorical columns encoded"""
+        # Parse straight into Arrow columns; strings stay in Arrow buffers
+        try:
+            table = paj.read_json(
+                jsonl_file,
+                read_options=paj.ReadOptions(block_size=JSONL_BLOCK_SIZE),
+                parse_options=paj.ParseOptions(
+                    explicit_schema=DOCUMENT_SCHEMA,
+                    unexpected_field_behavior='infer'
+                )
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            # Arrow needs one JSON type per field; exports mixing them (int and string ids,
+            # list and legacy string tags) are parsed row by row instead
+            logger.warning(f"Falling back to row-wise parsing: {e}")
+            table = self._parse_jsonl_rows(jsonl_file)
+        for name in CATEGORICAL_COLUMNS:
+            if name in table.column_names:
+                index = table.schema.get_field_index(name)
+                table = table.set_column(index, name, table[name].dictionary_encode())
+        return self._downcast_integers(table)
+    
+    def _parse_jsonl_rows(self, jsonl_file: Path) -> pa.Table:
+        """Parse a JSONL export whose field types vary between rows into an Arrow table"""
+        with open(jsonl_file, 'rb') as f:
+            rows = [orjson.loads(line) for line in f if line.strip()]
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        columns = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            columns[name] = self._metadata_array(values) if name == 'metadata' else self._column_array(values)
+        return pa.table(columns)
+    
+    def _metadata_array(self, values: List[Any]) -> pa.Array:
+        """Struct array for the metadata field, resolving mixed types one key at a time"""
+        if any(value is not None and not isinstance(value, dict) for value in values):
+            return self._column_array(values)
+        keys = list(dict.fromkeys(key for value in values if value for key in value))
+        if not keys:
+            return self._column_array(values)
+        
+        fields = []
+        for key in keys:
+            field_values = [value.get(key) if value else None for value in values]
+            if key == 'tags':
+                # Legacy comma-separated tags become lists so every row flattens the same way
+                field_values = [
+                    [tag.strip() for tag in tags.split(',')] if isinstance(tags, str) else tags
+                    for tags in field_values
+                ]
+            fields.append(self._column_array(field_values))
+        return pa.StructArray.from_arrays(fields, names=keys, mask=pa.array([value is None for value in values]))
+    
+    def _column_array(self, values: List[Any]) -> pa.Array:
+        """Arrow array for one field, keeping values as JSON text when their types are mixed"""
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.array(
+                [value if value is None or isinstance(value, str) else orjson.dumps(value).decode() for value in values],
+                pa.string()
+            )
+    
+    def _downcast_integers(self, table: pa.Table) -> pa.Table:
+        """Narrow top-level int64 columns to the smallest integer type holding their range"""
+        for index, field in enumerate(table.schema):
+            if field.type != pa.int64() or table[field.name].null_count == len(table):
+                continue
+            bounds = pc.min_max(table[field.name])
+            low, high = bounds['min'].as_py(), bounds['max'].as_py()
+            for candidate in (pa.int8(), pa.int16(), pa.int32()):
+                info = np.iinfo(candidate.to_pandas_dtype())
+                if info.min <= low and high <= info.max:
+                    table = table.set_column(index, field.name, table[field.name].cast(candidate))
+                    break
+        return table
+    
+    def _cache_key(self, jsonl_file: Path) -> Dict[bytes, bytes]:
+        """Schema metadata identifying the export a cache file was built from"""
+        return {
+            b'source_file': str(jsonl_file.resolve()).encode(),
+            b'source_mtime_ns': str(jsonl_file.stat().st_mtime_ns).encode()
+        }
+    
+    def _read_parquet_cache(self, jsonl_file: Path) -> Optional[pa.Table]:
+        """Return the cached table for this export, or None if missing or stale"""
+        cache_file = self.index_dir / PARQUET_CACHE_NAME
+        if not cache_file.exists():
+            return None
+        try:
+            metadata = pq.read_schema(cache_file).metadata or {}
+            key = self._cache_key(jsonl_file)
+            if any(metadata.get(k) != v for k, v in key.items()):
+                return None
+            table = pq.read_table(cache_file, memory_map=True)
+            logger.info(f"Loaded cached data from: {cache_file}")
+            return table
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parquet cache: {e}")
+            return None
+    
+    def _write_parquet_cache(self, table: pa.Table, jsonl_file: Path):
+        """Persist the parsed table so later runs can skip JSON parsing"""
+        cache_file = self.index_dir / PARQUET_CACHE_NAME
+        try:
+            metadata = dict(table.schema.metadata or {})
+            metadata.update(self._cache_key(jsonl_file))
+            pq.write_table(
+                table.replace_schema_metadata(metadata),
+                cache_file,
+                compression='snappy',
+                use_dictionary=[name for name in CATEGORICAL_COLUMNS if name in table.column_names]
+            )
+        except Exception as e:
+            logger.warning(f"Could not write parquet cache: {e}")
+    
     def generate_basic_analytics(self) -> Dict[str, Any]:
         """Generate basic analytics and statistics"""
         logger.info("Generating basic analytics...")
         
-        if self.documents_df is None or self.documents_df.empty:
+        if self.table is None or self.table.num_rows == 0:
             logger.warning("No data available for analysis")
             return {}
         
+        columns = self.table.column_names
         analytics = {
-            "total_documents": len(self.documents_df),
+            "total_documents": self.table.num_rows,
             "generated_at": datetime.utcnow().isoformat(),
             "data_sources": {},
             "document_types": {},
@@ -98,43 +337,42 @@ class LLMStackAnalytics:
             "quality_metrics": {}
         }
         
-        # Source analysis
-        if 'source' in self.documents_df.columns:
-            source_counts = self.documents_df['source'].value_counts().to_dict()
-            analytics["data_sources"] = source_counts
-        
-        # Type analysis
-        if 'type' in self.documents_df.columns:
-            type_counts = self.documents_df['type'].value_counts().to_dict()
-            analytics["document_types"] = type_counts
+        # Source and type analysis, both derived from one source x type grouping when possible
+        if 'source' in columns and 'type' in columns:
+            source_counts, type_counts = {}, {}
+            for source, doc_type, count in self._group_source_type():
+                if source is not None:
+                    source_counts[source] = source_counts.get(source, 0) + count
+                if doc_type is not None:
+                    type_counts[doc_type] = type_counts.get(doc_type, 0) + count
+            analytics["data_sources"] = self._sort_counts(source_counts)
+            analytics["document_types"] = self._sort_counts(type_counts)
+        elif 'source' in columns:
+            analytics["data_sources"] = self._value_counts(self.table['source'])
+        elif 'type' in columns:
+            analytics["document_types"] = self._value_counts(self.table['type'])
         
         # Content analysis
-        if 'content' in self.documents_df.columns:
-            content_lengths = self.documents_df['content'].str.len()
+        if 'content' in columns:
+            content_lengths = self._content_lengths
+            min_max = pc.min_max(content_lengths)
             analytics["content_analysis"] = {
-                "avg_length": int(content_lengths.mean()),
-                "min_length": int(content_lengths.min()),
-                "max_length": int(content_lengths.max()),
-                "total_characters": int(content_lengths.sum())
+                "avg_length": int(pc.mean(content_lengths).as_py()),
+                "min_length": min_max['min'].as_py(),
+                "max_length": min_max['max'].as_py(),
+                "total_characters": pc.sum(content_lengths).as_py()
             }
         
         # Tag analysis
-        if 'metadata' in self.documents_df.columns:
-            all_tags = []
-            for metadata in self.documents_df['metadata']:
-                if isinstance(metadata, dict) and 'tags' in metadata:
-                    tags = metadata['tags']
-                    if isinstance(tags, list):
-                        all_tags.extend(tags)
-                    elif isinstance(tags, str):
-                        all_tags.extend([t.strip() for t in tags.split(',')])
+        if 'metadata' in columns:
+            all_tags = self._flatten_tags()
             
-            if all_tags:
-                tag_counts = Counter(all_tags)
+            if all_tags is not None and len(all_tags) > 0:
+                tag_counts = self._value_counts(all_tags)
                 analytics["tag_analysis"] = {
                     "total_tags": len(all_tags),
                     "unique_tags": len(tag_counts),
-                    "top_tags": dict(tag_counts.most_common(10))
+                    "top_tags": dict(list(tag_counts.items())[:10])
                 }
         
         # Quality metrics
@@ -145,25 +383,66 @@ class LLMStackAnalytics:
         }
         
         self.analytics_data = analytics
+        # Recommendations depend on these metrics, so stale insights must be recomputed
+        self._insights_cache = None
         return analytics
     
+    def _value_counts(self, values: pa.ChunkedArray) -> Dict[Any, int]:
+        """Non-null value frequencies, most common first (ties in first-seen order)"""
+        counts = pc.value_counts(values)
+        pairs = zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist())
+        return self._sort_counts({value: count for value, count in pairs if value is not None})
+    
+    def _sort_counts(self, counts: Dict[Any, int]) -> Dict[Any, int]:
+        """Order a first-seen count dict by descending count, keeping ties stable"""
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+    
+    def _group_source_type(self) -> List[Tuple[Any, Any, int]]:
+        """(source, type, count) groups in first-seen order, null keys included; computed once"""
+        if self._source_type_counts is None:
+            # Single-threaded so groups come out in first-occurrence order
+            grouped = self.table.group_by(['source', 'type'], use_threads=False).aggregate([([], 'count_all')])
+            self._source_type_counts = list(zip(
+                grouped['source'].to_pylist(), grouped['type'].to_pylist(), grouped['count_all'].to_pylist()
+            ))
+        return self._source_type_counts
+    
+    def _flatten_tags(self) -> Optional[pa.Array]:
+        """All non-null tags from metadata.tags as one flat string array"""
+        metadata = self.table['metadata']
+        if not pa.types.is_struct(metadata.type):
+            return None
+        tags_index = metadata.type.get_field_index('tags')
+        if tags_index < 0:
+            return None
+        
+        tags = pc.struct_field(metadata, [tags_index])
+        if pa.types.is_list(tags.type) or pa.types.is_large_list(tags.type):
+            flat = pc.list_flatten(tags)
+        elif pa.types.is_string(tags.type):
+            # Legacy exports store tags as a comma-separated string
+            flat = pc.utf8_trim_whitespace(pc.list_flatten(pc.split_pattern(tags, ',')))
+        else:
+            return None
+        return pc.drop_null(flat)
+    
     def _calculate_completeness(self) -> float:
         """Calculate data completeness score"""
-        if self.documents_df is None:
+        if self.table is None:
             return 0.0
         
         required_fields = ['id', 'title', 'content', 'source', 'type']
-        total_fields = len(required_fields) * len(self.documents_df)
+        total_fields = len(required_fields) * self.table.num_rows
         filled_fields = sum(
-            sum(1 for field in required_fields if pd.notna(self.documents_df[field].iloc[i]))
-            for i in range(len(self.documents_df))
+            self.table.num_rows - self._null_counts[field]
+            for field in required_fields if field in self._null_counts
         )
         
         return round(filled_fields / total_fields * 100, 2) if total_fields > 0 else 0.0
     
     def _calculate_consistency(self) -> float:
         """Calculate data consistency score"""
-        if self.documents_df is None:
+        if self.table is None:
             return 0.0
         
         # Check for consistent data types and formats
@@ -171,45 +450,66 @@ class LLMStackAnalytics:
         checks = 0
         
         # Check ID format consistency
-        if 'id' in self.documents_df.columns:
-            id_consistency = self.documents_df['id'].apply(lambda x: isinstance(x, (str, int))).mean()
+        if 'id' in self.table.column_names:
+            id_consistency = self._type_consistency('id', (str, int))
             consistency_score += id_consistency
             checks += 1
         
         # Check source consistency
-        if 'source' in self.documents_df.columns:
-            source_consistency = self.documents_df['source'].apply(lambda x: isinstance(x, str)).mean()
+        if 'source' in self.table.column_names:
+            source_consistency = self._type_consistency('source', (str,))
             consistency_score += source_consistency
             checks += 1
         
         # Check type consistency
-        if 'type' in self.documents_df.columns:
-            type_consistency = self.documents_df['type'].apply(lambda x: isinstance(x, str)).mean()
+        if 'type' in self.table.column_names:
+            type_consistency = self._type_consistency('type', (str,))
             consistency_score += type_consistency
             checks += 1
         
         return round(consistency_score / checks * 100, 2) if checks > 0 else 0.0
     
+    def _type_consistency(self, name: str, allowed: Tuple[type, ...]) -> float:
+        """Share of values in a column that are instances of the allowed types"""
+        # Arrow columns are homogeneous: the type answers the question, nulls aside
+        arrow_type = self.table.schema.field(name).type
+        if pa.types.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        matches = (
+            (str in allowed and (pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)))
+            or (int in allowed and pa.types.is_integer(arrow_type))
+        )
+        if not matches or self.table.num_rows == 0:
+            return 0.0
+        return 1.0 - self._null_counts[name] / self.table.num_rows
+    
     def _calculate_richness(self) -> float:
         """Calculate data richness score"""
-        if self.documents_df is None:
+        if self.table is None:
             return 0.0
         
         richness_score = 0.0
         checks = 0
         
         # Check content richness
-        if 'content' in self.documents_df.columns:
-            avg_content_length = self.documents_df['content'].str.len().mean()
+        if 'content' in self.table.column_names:
+            avg_content_length = pc.mean(self._content_lengths).as_py() or 0
             content_richness = min(avg_content_length / 100, 1.0)  # Normalize to 0-1
             richness_score += content_richness
             checks += 1
         
         # Check metadata richness
-        if 'metadata' in self.documents_df.columns:
-            metadata_richness = self.documents_df['metadata'].apply(
-                lambda x: len(x) if isinstance(x, dict) else 0
-            ).mean() / 5  # Normalize to 0-1 (assuming 5 is good)
+        # Arrow structs carry the union of keys across sources, so count populated fields only
+        if 'metadata' in self.table.column_names:
+            metadata = self.table['metadata']
+            populated_fields = 0
+            if pa.types.is_struct(metadata.type):
+                # struct_field propagates parent nulls, so missing metadata counts as empty
+                populated_fields = sum(
+                    pc.sum(pc.is_valid(pc.struct_field(metadata, [i]))).as_py() or 0
+                    for i in range(metadata.type.num_fields)
+                )
+            metadata_richness = populated_fields / self.table.num_rows / 5  # Normalize to 0-1 (assuming 5 is good)
             richness_score += metadata_richness
             checks += 1
         
@@ -217,9 +517,12 @@ class LLMStackAnalytics:
     
     def generate_advanced_insights(self) -> Dict[str, Any]:
         """Generate advanced insights and patterns"""
+        if self._insights_cache is not None:
+            return self._insights_cache
+        
         logger.info("Generating advanced insights...")
         
-        if self.documents_df is None or self.documents_df.empty:
+        if self.table is None or self.table.num_rows == 0:
             return {}
         
         insights = {
@@ -241,6 +544,7 @@ class LLMStackAnalytics:
         # Recommendations
         insights["recommendations"] = self._generate_recommendations()
         
+        self._insights_cache = insights
         return insights
     
     def _analyze_patterns(self) -> Dict[str, Any]:
@@ -248,70 +552,115 @@ class LLMStackAnalytics:
         patterns = {}
         
         # Source-type patterns
-        if 'source' in self.documents_df.columns and 'type' in self.documents_df.columns:
-            source_type_pattern = self.documents_df.groupby(['source', 'type']).size().unstack(fill_value=0)
-            patterns["source_type_distribution"] = source_type_pattern.to_dict()
+        if 'source' in self.table.column_names and 'type' in self.table.column_names:
+            rows = [
+                (source, doc_type, count) for source, doc_type, count in self._group_source_type()
+                if source is not None and doc_type is not None
+            ]
+            # Dense {type: {source: count}} table, matching an unstacked crosstab
+            sources = sorted({source for source, _, _ in rows})
+            distribution = {doc_type: dict.fromkeys(sources, 0) for doc_type in sorted({t for _, t, _ in rows})}
+            for source, doc_type, count in rows:
+                distribution[doc_type][source] = count
+            patterns["source_type_distribution"] = distribution
         
         # Content patterns
-        if 'content' in self.documents_df.columns:
+        if 'content' in self.table.column_names:
             # Word frequency analysis
-            all_words = ' '.join(self.documents_df['content'].astype(str)).lower().split()
-            word_freq = Counter(all_words)
-            # Remove common stop words
-            stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-            filtered_words = {word: count for word, count in word_freq.items() 
-                            if word not in stop_words and len(word) > 3}
-            patterns["top_keywords"] = dict(Counter(filtered_words).most_common(20))
+            contents = [content for content in self.table['content'].to_pylist() if isinstance(content, str)]
+            patterns["top_keywords"] = self._count_keywords(contents, top_n=20)
         
         return patterns
     
+    def _count_keywords(self, contents: List[str], top_n: int) -> Dict[str, int]:
+        """Count keywords (longer than 3 chars, no stop words) across documents"""
+        # The JIT kernel lowercases bytes, so it only handles pure-ASCII corpora exactly;
+        # ASCII strings are one byte per char, so the joined size is known without joining
+        if (NUMBA_AVAILABLE and sum(map(len, contents)) + len(contents) > NUMBA_MIN_BYTES
+                and all(content.isascii() for content in contents)):
+            buffer = ' '.join(contents).encode('ascii')
+            data = np.frombuffer(buffer, dtype=np.uint8)
+            counts, starts, lengths = _count_ascii_tokens(data, 4)
+            # Highest count first, ties broken by first occurrence (Counter.most_common order)
+            keywords = {}
+            for i in np.lexsort((starts, -counts)):
+                word = buffer[starts[i]:starts[i] + lengths[i]].decode('ascii').lower()
+                if word in STOP_WORDS:
+                    continue
+                keywords[word] = int(counts[i])
+                if len(keywords) == top_n:
+                    break
+            return keywords
+        
+        word_freq = Counter()
+        for content in contents:
+            word_freq.update(
+                word for word in content.lower().split()
+                if len(word) > 3 and word not in STOP_WORDS
+            )
+        return dict(word_freq.most_common(top_n))
+    
     def _analyze_trends(self) -> Dict[str, Any]:
         """Analyze temporal trends"""
         trends = {}
         
         # Extract dates if available
-        if 'extracted_at' in self.documents_df.columns:
+        if 'extracted_at' in self.table.column_names:
             try:
-                self.documents_df['date'] = pd.to_datetime(self.documents_df['extracted_at'])
-                date_counts = self.documents_df['date'].dt.date.value_counts().sort_index()
-                trends["daily_volume"] = {str(k): int(v) for k, v in date_counts.to_dict().items()}
+                timestamps = self._parse_timestamps(self.table['extracted_at'])
+                trends["daily_volume"] = self._counts_by_key(pc.cast(timestamps, pa.date32()))
                 
                 # Weekly trends
-                weekly_counts = self.documents_df.groupby(
-                    self.documents_df['date'].dt.isocalendar().week
-                ).size()
-                trends["weekly_volume"] = {str(k): int(v) for k, v in weekly_counts.to_dict().items()}
+                trends["weekly_volume"] = self._counts_by_key(pc.iso_week(timestamps))
                 
             except Exception as e:
                 logger.warning(f"Date analysis failed: {e}")
         
         return trends
     
+    def _parse_timestamps(self, values: pa.ChunkedArray) -> pa.ChunkedArray:
+        """Parse ISO-8601 strings with Arrow's vectorized cast"""
+        if pa.types.is_timestamp(values.type):
+            return values
+        try:
+            return pc.cast(values, pa.timestamp('us'))
+        except pa.ArrowInvalid:
+            # Zone-suffixed values ('Z', '+00:00') only parse into a zoned type
+            return pc.cast(values, pa.timestamp('us', tz='UTC'))
+    
+    def _counts_by_key(self, values: pa.ChunkedArray) -> Dict[str, int]:
+        """Non-null value frequencies keyed by the value's string form, in key order"""
+        counts = pc.value_counts(values)
+        pairs = zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist())
+        return {str(value): count for value, count in sorted(pair for pair in pairs if pair[0] is not None)}
+    
     def _detect_anomalies(self) -> Dict[str, Any]:
         """Detect anomalies in the data"""
         anomalies = {}
         
         # Content length anomalies
-        if 'content' in self.documents_df.columns:
-            content_lengths = self.documents_df['content'].str.len()
-            Q1 = content_lengths.quantile(0.25)
-            Q3 = content_lengths.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = content_lengths[(content_lengths < lower_bound) | (content_lengths > upper_bound)]
-            if not outliers.empty:
-                anomalies["content_length_outliers"] = {
-                    "count": len(outliers),
-                    "indices": outliers.index.tolist(),
-                    "values": outliers.tolist()
-                }
+        if 'content' in self.table.column_names:
+            content_lengths = self._content_lengths
+            if content_lengths.null_count < len(content_lengths):
+                # Null content becomes NaN, which nanquantile skips and never compares as an outlier
+                lengths = content_lengths.to_numpy(zero_copy_only=False)
+                Q1, Q3 = np.nanquantile(lengths, [0.25, 0.75])
+                IQR = Q3 - Q1
+                lower_bound = Q1 - 1.5 * IQR
+                upper_bound = Q3 + 1.5 * IQR
+                
+                outlier_indices = np.flatnonzero((lengths < lower_bound) | (lengths > upper_bound))
+                if outlier_indices.size > 0:
+                    anomalies["content_length_outliers"] = {
+                        "count": int(outlier_indices.size),
+                        "indices": outlier_indices,
+                        "values": lengths[outlier_indices].astype(np.int64)
+                    }
         
         # Missing data anomalies
-        missing_data = self.documents_df.isnull().sum()
-        if missing_data.sum() > 0:
-            anomalies["missing_data"] = missing_data[missing_data > 0].to_dict()
+        missing_data = {name: count for name, count in self._null_counts.items() if count > 0}
+        if missing_data:
+            anomalies["missing_data"] = missing_data
         
         return anomalies
     
@@ -330,14 +679,14 @@ class LLMStackAnalytics:
                 recommendations.append(f"Enhance data consistency (currently {consistency}%)")
         
         # Content recommendations
-        if self.documents_df is not None and 'content' in self.documents_df.columns:
-            avg_length = self.documents_df['content'].str.len().mean()
+        if self.table is not None and 'content' in self.table.column_names:
+            avg_length = pc.mean(self._content_lengths).as_py() or 0
             if avg_length < 100:
                 recommendations.append("Consider enriching document content for better searchability")
         
         # Tag recommendations
         if self.analytics_data.get("tag_analysis"):
-            tag_coverage = self.analytics_data["tag_analysis"]["total_tags"] / len(self.documents_df)
+            tag_coverage = self.analytics_data["tag_analysis"]["total_tags"] / self.table.num_rows
             if tag_coverage < 2:
                 recommendations.append("Increase tagging coverage for better content organization")
         
@@ -346,167 +695,22 @@ class LLMStackAnalytics:
         
         return recommendations
     
+    def _plot_content_lengths(self) -> Optional[np.ndarray]:
+        """Non-null content lengths for the histogram panels"""
+        if self._content_lengths is None:
+            return None
+        return pc.drop_null(self._content_lengths).to_numpy()
+    
     def create_visualizations(self) -> bool:
         """Create comprehensive visualizations"""
-        logger.info("Creating visualizations...")
-        
-        try:
-            # Set style
-            plt.style.use('seaborn-v0_8')
-            sns.set_palette("husl")
-            
-            # Create subplots
-            fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-            fig.suptitle('LLM Stack Analytics Dashboard', fontsize=16, fontweight='bold')
-            
-            # 1. Source Distribution
-            if self.analytics_data.get("data_sources"):
-                sources = list(self.analytics_data["data_sources"].keys())
-                counts = list(self.analytics_data["data_sources"].values())
-                axes[0, 0].pie(counts, labels=sources, autopct='%1.1f%%', startangle=90)
-                axes[0, 0].set_title('Data Source Distribution')
-            
-            # 2. Document Type Distribution
-            if self.analytics_data.get("document_types"):
-                types = list(self.analytics_data["document_types"].keys())
-                type_counts = list(self.analytics_data["document_types"].values())
-                axes[0, 1].bar(types, type_counts, color='skyblue')
-                axes[0, 1].set_title('Document Type Distribution')
-                axes[0, 1].tick_params(axis='x', rotation=45)
-            
-            # 3. Content Length Distribution
-            if self.documents_df is not None and 'content' in self.documents_df.columns:
-                content_lengths = self.documents_df['content'].str.len()
-                axes[0, 2].hist(content_lengths, bins=20, color='lightgreen', alpha=0.7)
-                axes[0, 2].set_title('Content Length Distribution')
-                axes[0, 2].set_xlabel('Content Length (characters)')
-                axes[0, 2].set_ylabel('Frequency')
-            
-            # 4. Quality Metrics
-            if self.analytics_data.get("quality_metrics"):
-                metrics = ['Completeness', 'Consistency', 'Richness']
-                values = [
-                    self.analytics_data["quality_metrics"]["completeness"],
-                    self.analytics_data["quality_metrics"]["consistency"],
-                    self.analytics_data["quality_metrics"]["richness"]
-                ]
-                bars = axes[1, 0].bar(metrics, values, color=['#ff6b6b', '#4ecdc4', '#45b7d1'])
-                axes[1, 0].set_title('Data Quality Metrics')
-                axes[1, 0].set_ylabel('Score (%)')
-                axes[1, 0].set_ylim(0, 100)
-                
-                # Add value labels on bars
-                for bar, value in zip(bars, values):
-                    height = bar.get_height()
-                    axes[1, 0].text(bar.get_x() + bar.get_width()/2., height + 1,
-                                   f'{value:.1f}%', ha='center', va='bottom')
-            
-            # 5. Top Tags
-            if self.analytics_data.get("tag_analysis", {}).get("top_tags"):
-                top_tags = dict(list(self.analytics_data["tag_analysis"]["top_tags"].items())[:10])
-                tag_names = list(top_tags.keys())
-                tag_counts = list(top_tags.values())
-                axes[1, 1].barh(tag_names, tag_counts, color='gold')
-                axes[1, 1].set_title('Top 10 Tags')
-                axes[1, 1].set_xlabel('Count')
-            
-            # 6. Content Analysis
-            if self.analytics_data.get("content_analysis"):
-                content_stats = self.analytics_data["content_analysis"]
-                stats_labels = ['Avg Length', 'Min Length', 'Max Length']
-                stats_values = [content_stats["avg_length"], content_stats["min_length"], content_stats["max_length"]]
-                axes[1, 2].bar(stats_labels, stats_values, color=['#ff9ff3', '#54a0ff', '#5f27cd'])
-                axes[1, 2].set_title('Content Statistics')
-                axes[1, 2].set_ylabel('Characters')
-            
-            plt.tight_layout()
-            
-            # Save visualization
-            viz_file = self.output_dir / "analytics-dashboard.png"
-            plt.savefig(viz_file, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            logger.info(f"Visualizations saved to: {viz_file}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to create visualizations: {e}")
-            return False
+        return render_static_dashboard(self.analytics_data, self._plot_content_lengths(), self.output_dir)
     
     def create_interactive_dashboard(self) -> bool:
         """Create an interactive Plotly dashboard"""
-        logger.info("Creating interactive dashboard...")
-        
-        try:
-            if self.documents_df is None or self.documents_df.empty:
-                logger.warning("No data available for interactive dashboard")
-                return False
-            
-            # Create subplots
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=('Data Source Distribution', 'Document Type Distribution',
-                              'Content Length Analysis', 'Quality Metrics'),
-                specs=[[{"type": "pie"}, {"type": "bar"}],
-                       [{"type": "histogram"}, {"type": "bar"}]]
-            )
-            
-            # 1. Source Distribution (Pie Chart)
-            if self.analytics_data.get("data_sources"):
-                sources = list(self.analytics_data["data_sources"].keys())
-                counts = list(self.analytics_data["data_sources"].values())
-                fig.add_trace(
-                    go.Pie(labels=sources, values=counts, name="Sources"),
-                    row=1, col=1
-                )
-            
-            # 2. Document Type Distribution (Bar Chart)
-            if self.analytics_data.get("document_types"):
-                types = list(self.analytics_data["document_types"].keys())
-                type_counts = list(self.analytics_data["document_types"].values())
-                fig.add_trace(
-                    go.Bar(x=types, y=type_counts, name="Types", marker_color='skyblue'),
-                    row=1, col=2
-                )
-            
-            # 3. Content Length Distribution (Histogram)
-            if 'content' in self.documents_df.columns:
-                content_lengths = self.documents_df['content'].str.len()
-                fig.add_trace(
-                    go.Histogram(x=content_lengths, name="Content Length", marker_color='lightgreen'),
-                    row=2, col=1
-                )
-            
-            # 4. Quality Metrics (Bar Chart)
-            if self.analytics_data.get("quality_metrics"):
-                metrics = ['Completeness', 'Consistency', 'Richness']
-                values = [
-                    self.analytics_data["quality_metrics"]["completeness"],
-                    self.analytics_data["quality_metrics"]["consistency"],
-                    self.analytics_data["quality_metrics"]["richness"]
-                ]
-                fig.add_trace(
-                    go.Bar(x=metrics, y=values, name="Quality", marker_color=['#ff6b6b', '#4ecdc4', '#45b7d1']),
-                    row=2, col=2
-                )
-            
-            # Update layout
-            fig.update_layout(
-                title_text="LLM Stack Analytics Dashboard",
-                showlegend=False,
-                height=800
-            )
-            
-            # Save interactive dashboard
-            dashboard_file = self.output_dir / "interactive-dashboard.html"
-            fig.write_html(str(dashboard_file))
-            
-            logger.info(f"Interactive dashboard saved to: {dashboard_file}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to create interactive dashboard: {e}")
+        if self.table is None or self.table.num_rows == 0:
+            logger.warning("No data available for interactive dashboard")
             return False
+        return render_interactive_dashboard(self.analytics_data, self._plot_content_lengths(), self.output_dir)
     
     def generate_report(self) -> bool:
         """Generate comprehensive analytics report"""
@@ -537,8 +741,8 @@ class LLMStackAnalytics:
             
             # Save report
             report_file = self.output_dir / "analytics-report.json"
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(report, option=REPORT_JSON_OPTIONS))
             
             # Save summary report
             summary_file = self.output_dir / "analytics-summary.md"
@@ -555,7 +759,7 @@ class LLMStackAnalytics:
     
     def _generate_markdown_summary(self, report: Dict[str, Any]) -> str:
         """Generate markdown summary of analytics"""
-        summary = f"""# LLM Stack Analytics Report
+        parts = [f"""# LLM Stack Analytics Report
 
 ## Executive Summary
 - **Total Documents**: {report['summary']['total_documents']}
@@ -566,53 +770,54 @@ class LLMStackAnalytics:
 ## Key Insights
 
 ### Data Quality Metrics
-"""
+"""]
         
         if report['analytics'].get('quality_metrics'):
             metrics = report['analytics']['quality_metrics']
-            summary += f"""
+            parts.append(f"""
 - **Completeness**: {metrics['completeness']}%
 - **Consistency**: {metrics['consistency']}%
 - **Richness**: {metrics['richness']}%
-"""
+""")
         
-        summary += f"""
+        parts.append("""
 ### Data Distribution
-"""
+""")
         
         if report['analytics'].get('data_sources'):
-            summary += "\n**By Source:**\n"
+            parts.append("\n**By Source:**\n")
             for source, count in report['analytics']['data_sources'].items():
-                summary += f"- {source}: {count} documents\n"
+                parts.append(f"- {source}: {count} documents\n")
         
         if report['analytics'].get('document_types'):
-            summary += "\n**By Type:**\n"
+            parts.append("\n**By Type:**\n")
             for doc_type, count in report['analytics']['document_types'].items():
-                summary += f"- {doc_type}: {count} documents\n"
+                parts.append(f"- {doc_type}: {count} documents\n")
         
-        summary += f"""
+        parts.append("""
 ## Recommendations
-"""
+""")
         
         for rec in report.get('recommendations', []):
-            summary += f"- {rec}\n"
+            parts.append(f"- {rec}\n")
         
-        summary += f"""
+        parts.append("""
 ## Generated Files
-"""
+""")
         
         for file in report.get('files_generated', []):
-            summary += f"- {file}\n"
+            parts.append(f"- {file}\n")
         
-        summary += f"""
+        parts.append("""
 ---
 *Report generated by LLM Stack Analytics Engine*
-"""
+""")
         
-        return summary
+        return "".join(parts)
     
-    def run_full_analysis(self) -> bool:
-        """Run complete analytics pipeline"""
+    def run_full_analysis(self, formats: Optional[set] = None) -> bool:
+        """Run complete analytics pipeline, producing only the requested output formats"""
+        formats = set(OUTPUT_FORMATS) if formats is None else formats
         logger.info("Starting full analytics pipeline...")
         
         try:
@@ -624,14 +829,28 @@ class LLMStackAnalytics:
             # Generate basic analytics
             self.generate_basic_analytics()
             
-            # Create visualizations
-            self.create_visualizations()
+            # Both dashboards only read the analytics dict and lengths, so render
+            # them in worker processes while the insights are computed here
+            renderers = []
+            if 'png' in formats:
+                renderers.append(render_static_dashboard)
+            if 'html' in formats:
+                renderers.append(render_interactive_dashboard)
+            if renderers:
+                content_lengths = self._plot_content_lengths()
+                with ProcessPoolExecutor(max_workers=len(renderers)) as executor:
+                    futures = [
+                        executor.submit(renderer, self.analytics_data, content_lengths, self.output_dir)
+                        for renderer in renderers
+                    ]
+                    if 'json' in formats:
+                        self.generate_advanced_insights()
+                    for future in futures:
+                        future.result()
             
-            # Create interactive dashboard
-            self.create_interactive_dashboard()
-            
-            # Generate report
-            self.generate_report()
+            # Generate report once the dashboards exist so they are listed in it
+            if 'json' in formats:
+                self.generate_report()
             
             logger.info("✅ Analytics pipeline completed successfully!")
             return True
@@ -640,6 +859,188 @@ class LLMStackAnalytics:
             logger.error(f"Analytics pipeline failed: {e}")
             return False
 
+def render_static_dashboard(analytics_data: Dict[str, Any], content_lengths: Optional[np.ndarray],
+                            output_dir: Path) -> bool:
+    """Render the matplotlib dashboard PNG from precomputed analytics.
+    
+    Module-level and fed only picklable inputs so it can run in a worker process.
+    """
+    logger.info("Creating visualizations...")
+    
+    try:
+        # Plotting stacks are imported on demand so --quick runs never load them
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        # Set style
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        
+        # Create subplots
+        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+        fig.suptitle('LLM Stack Analytics Dashboard', fontsize=16, fontweight='bold')
+        
+        # 1. Source Distribution
+        if analytics_data.get("data_sources"):
+            sources = list(analytics_data["data_sources"].keys())
+            counts = list(analytics_data["data_sources"].values())
+            axes[0, 0].pie(counts, labels=sources, autopct='%1.1f%%', startangle=90)
+            axes[0, 0].set_title('Data Source Distribution')
+        
+        # 2. Document Type Distribution
+        if analytics_data.get("document_types"):
+            types = list(analytics_data["document_types"].keys())
+            type_counts = list(analytics_data["document_types"].values())
+            axes[0, 1].bar(types, type_counts, color='skyblue')
+            axes[0, 1].set_title('Document Type Distribution')
+            axes[0, 1].tick_params(axis='x', rotation=45)
+        
+        # 3. Content Length Distribution
+        if content_lengths is not None:
+            axes[0, 2].hist(content_lengths, bins=20, color='lightgreen', alpha=0.7)
+            axes[0, 2].set_title('Content Length Distribution')
+            axes[0, 2].set_xlabel('Content Length (characters)')
+            axes[0, 2].set_ylabel('Frequency')
+        
+        # 4. Quality Metrics
+        if analytics_data.get("quality_metrics"):
+            metrics = ['Completeness', 'Consistency', 'Richness']
+            values = [
+                analytics_data["quality_metrics"]["completeness"],
+                analytics_data["quality_metrics"]["consistency"],
+                analytics_data["quality_metrics"]["richness"]
+            ]
+            bars = axes[1, 0].bar(metrics, values, color=['#ff6b6b', '#4ecdc4', '#45b7d1'])
+            axes[1, 0].set_title('Data Quality Metrics')
+            axes[1, 0].set_ylabel('Score (%)')
+            axes[1, 0].set_ylim(0, 100)
+            
+            # Add value labels on bars
+            for bar, value in zip(bars, values):
+                height = bar.get_height()
+                axes[1, 0].text(bar.get_x() + bar.get_width()/2., height + 1,
+                               f'{value:.1f}%', ha='center', va='bottom')
+        
+        # 5. Top Tags
+        if analytics_data.get("tag_analysis", {}).get("top_tags"):
+            top_tags = dict(list(analytics_data["tag_analysis"]["top_tags"].items())[:10])
+            tag_names = list(top_tags.keys())
+            tag_counts = list(top_tags.values())
+            axes[1, 1].barh(tag_names, tag_counts, color='gold')
+            axes[1, 1].set_title('Top 10 Tags')
+            axes[1, 1].set_xlabel('Count')
+        
+        # 6. Content Analysis
+        if analytics_data.get("content_analysis"):
+            content_stats = analytics_data["content_analysis"]
+            stats_labels = ['Avg Length', 'Min Length', 'Max Length']
+            stats_values = [content_stats["avg_length"], content_stats["min_length"], content_stats["max_length"]]
+            axes[1, 2].bar(stats_labels, stats_values, color=['#ff9ff3', '#54a0ff', '#5f27cd'])
+            axes[1, 2].set_title('Content Statistics')
+            axes[1, 2].set_ylabel('Characters')
+        
+        plt.tight_layout()
+        
+        # Save visualization
+        viz_file = output_dir / "analytics-dashboard.png"
+        plt.savefig(viz_file, dpi=300, bbox_inches='tight')
+        plt.close()
+        
+        logger.info(f"Visualizations saved to: {viz_file}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to create visualizations: {e}")
+        return False
+
+def render_interactive_dashboard(analytics_data: Dict[str, Any], content_lengths: Optional[np.ndarray],
+                                 output_dir: Path) -> bool:
+    """Render the Plotly dashboard HTML from precomputed analytics"""
+    logger.info("Creating interactive dashboard...")
+    
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
+        # Create subplots
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Data Source Distribution', 'Document Type Distribution',
+                          'Content Length Analysis', 'Quality Metrics'),
+            specs=[[{"type": "pie"}, {"type": "bar"}],
+                   [{"type": "histogram"}, {"type": "bar"}]]
+        )
+        
+        # 1. Source Distribution (Pie Chart)
+        if analytics_data.get("data_sources"):
+            sources = list(analytics_data["data_sources"].keys())
+            counts = list(analytics_data["data_sources"].values())
+            fig.add_trace(
+                go.Pie(labels=sources, values=counts, name="Sources"),
+                row=1, col=1
+            )
+        
+        # 2. Document Type Distribution (Bar Chart)
+        if analytics_data.get("document_types"):
+            types = list(analytics_data["document_types"].keys())
+            type_counts = list(analytics_data["document_types"].values())
+            fig.add_trace(
+                go.Bar(x=types, y=type_counts, name="Types", marker_color='skyblue'),
+                row=1, col=2
+            )
+        
+        # 3. Content Length Distribution (Histogram)
+        if content_lengths is not None:
+            fig.add_trace(
+                go.Histogram(x=content_lengths, name="Content Length", marker_color='lightgreen'),
+                row=2, col=1
+            )
+        
+        # 4. Quality Metrics (Bar Chart)
+        if analytics_data.get("quality_metrics"):
+            metrics = ['Completeness', 'Consistency', 'Richness']
+            values = [
+                analytics_data["quality_metrics"]["completeness"],
+                analytics_data["quality_metrics"]["consistency"],
+                analytics_data["quality_metrics"]["richness"]
+            ]
+            fig.add_trace(
+                go.Bar(x=metrics, y=values, name="Quality", marker_color=['#ff6b6b', '#4ecdc4', '#45b7d1']),
+                row=2, col=2
+            )
+        
+        # Update layout
+        fig.update_layout(
+            title_text="LLM Stack Analytics Dashboard",
+            showlegend=False,
+            height=800
+        )
+        
+        # Save interactive dashboard
+        dashboard_file = output_dir / "interactive-dashboard.html"
+        fig.write_html(str(dashboard_file))
+        
+        logger.info(f"Interactive dashboard saved to: {dashboard_file}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to create interactive dashboard: {e}")
+        return False
+
+def parse_formats(value: str) -> set:
+    """Parse a comma-separated --formats value ('all' selects every format)"""
+    formats = {item.strip().lower() for item in value.split(',') if item.strip()}
+    if 'all' in formats:
+        return set(OUTPUT_FORMATS)
+    unknown = formats - set(OUTPUT_FORMATS)
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"invalid format(s) {', '.join(sorted(unknown)) or value!r}; choose from {', '.join(OUTPUT_FORMATS)} or all"
+        )
+    return formats
+
 def main():
     parser = argparse.ArgumentParser(description='LLM Stack Analytics Engine')
     parser.add_argument('--index-dir', default='rag-index',
@@ -648,6 +1049,8 @@ def main():
                        help='Output directory for analytics')
     parser.add_argument('--quick', action='store_true',
                        help='Run quick analysis only')
+    parser.add_argument('--formats', type=parse_formats, default='all',
+                       help='Comma-separated outputs to produce: json, html, png or all (default: all)')
     
     args = parser.parse_args()
     
@@ -666,7 +1069,7 @@ def main():
                 return 1
         else:
             # Full analysis
-            success = analytics.run_full_analysis()
+            success = analytics.run_full_analysis(args.formats)
             if success:
                 print("✅ Full analytics pipeline completed!")
                 return 0
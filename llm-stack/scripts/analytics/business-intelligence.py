@@ -4,35 +4,48 @@ Business Intelligence Dashboard for LLM Stack
 Provides executive insights, KPIs, and strategic recommendations.
 
 Usage:
-    python business-intelligence.py [--analytics-dir analytics-output/] [--port 5002]
+    python business-intelligence.py [--analytics-dir analytics-output/] [--port 5002] [--dashboard]
 """
 
 import json
 import argparse
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import logging
-from typing import Dict, Any, List, Optional
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from dash import Dash, html, dcc, Input, Output, callback
-import dash_bootstrap_components as dbc
-from dash.exceptions import PreventUpdate
+import bisect
+from collections import namedtuple
+from functools import cached_property
+from typing import Dict, Any, List
+
+# Faster JSON parsing/serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Report sections the KPI helpers read, resolved once per calculate_kpis() run
+ReportViews = namedtuple('ReportViews', 'analytics summary quality content tags')
+
+# Overall quality score buckets shared by the health and maturity classifiers
+QUALITY_THRESHOLDS = (60, 70, 80, 90)
+HEALTH_LABELS = ("Critical", "Poor", "Fair", "Good", "Excellent")
+MATURITY_LABELS = ("Initial", "Basic", "Developing", "Mature", "Advanced")
+
 class BusinessIntelligence:
     def __init__(self, analytics_dir: str = "analytics-output"):
         self.analytics_dir = Path(analytics_dir)
         self.analytics_data = {}
         self.bi_metrics = {}
+        self._overall_quality = None
+        self._views = None
         
-        logger.info(f"Initialized Business Intelligence with analytics directory: {analytics_dir}")
+        logger.info("Initialized Business Intelligence with analytics directory: %s", analytics_dir)
     
     def load_analytics_data(self) -> bool:
         """Load analytics data for BI processing"""
@@ -40,8 +53,9 @@ class BusinessIntelligence:
             # Load analytics report
             report_file = self.analytics_dir / "analytics-report.json"
             if report_file.exists():
-                with open(report_file, 'r') as f:
-                    self.analytics_data = json.load(f)
+                with open(report_file, 'rb') as f:
+                    raw = f.read()
+                self.analytics_data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
                 logger.info("Loaded analytics data for BI processing")
                 return True
             else:
@@ -49,7 +63,7 @@ class BusinessIntelligence:
                 return False
                 
         except Exception as e:
-            logger.error(f"Failed to load analytics data: {e}")
+            logger.error("Failed to load analytics data: %s", e)
             return False
     
     def calculate_kpis(self) -> Dict[str, Any]:
@@ -67,29 +81,37 @@ class BusinessIntelligence:
             "strategic_insights": {}
         }
         
+        # Walk the report structure once; the helpers read these views
+        analytics = self.analytics_data.get("analytics", {})
+        self._views = views = ReportViews(
+            analytics=analytics,
+            summary=self.analytics_data.get("summary", {}),
+            quality=analytics.get("quality_metrics", {}),
+            content=analytics.get("content_analysis", {}),
+            tags=analytics.get("tag_analysis", {})
+        )
+        
         # Data Volume KPIs
-        total_docs = self.analytics_data.get("summary", {}).get("total_documents", 0)
         kpis["data_volume"] = {
-            "total_documents": total_docs,
-            "documents_per_source": self.analytics_data.get("analytics", {}).get("data_sources", {}),
-            "documents_per_type": self.analytics_data.get("analytics", {}).get("document_types", {}),
+            "total_documents": views.summary.get("total_documents", 0),
+            "documents_per_source": views.analytics.get("data_sources", {}),
+            "documents_per_type": views.analytics.get("document_types", {}),
             "growth_rate": self._calculate_growth_rate()
         }
         
         # Data Quality KPIs
-        quality_metrics = self.analytics_data.get("analytics", {}).get("quality_metrics", {})
+        self._overall_quality = self._calculate_overall_quality_score(views.quality)
         kpis["data_quality"] = {
-            "overall_score": self._calculate_overall_quality_score(quality_metrics),
-            "completeness": quality_metrics.get("completeness", 0),
-            "consistency": quality_metrics.get("consistency", 0),
-            "richness": quality_metrics.get("richness", 0),
-            "data_health_index": self._calculate_data_health_index(quality_metrics)
+            "overall_score": self._overall_quality,
+            "completeness": views.quality.get("completeness", 0),
+            "consistency": views.quality.get("consistency", 0),
+            "richness": views.quality.get("richness", 0),
+            "data_health_index": self._calculate_data_health_index()
         }
         
         # Content Richness KPIs
-        content_analysis = self.analytics_data.get("analytics", {}).get("content_analysis", {})
         kpis["content_richness"] = {
-            "average_content_length": content_analysis.get("avg_length", 0),
+            "average_content_length": views.content.get("avg_length", 0),
             "content_diversity": self._calculate_content_diversity(),
             "tag_coverage": self._calculate_tag_coverage(),
             "metadata_completeness": self._calculate_metadata_completeness()
@@ -105,10 +127,15 @@ class BusinessIntelligence:
         # Strategic Insights
         kpis["strategic_insights"] = {
             "data_maturity_level": self._assess_data_maturity(),
-            "improvement_opportunities": self._identify_improvement_opportunities(),
-            "roi_metrics": self._calculate_roi_metrics()
+            # Materialized by generate_bi_report() - see the cached properties below
+            "improvement_opportunities": None,
+            "roi_metrics": None
         }
         
+        # New KPIs invalidate any previously materialized insights
+        for name in ('improvement_opportunities', 'roi_metrics', 'strategic_recommendations', 'action_items'):
+            self.__dict__.pop(name, None)
+        
         self.bi_metrics = kpis
         return kpis
     
@@ -119,45 +146,28 @@ class BusinessIntelligence:
     
     def _calculate_overall_quality_score(self, quality_metrics: Dict[str, Any]) -> float:
         """Calculate overall data quality score"""
-        if not quality_metrics:
-            return 0.0
+        completeness = quality_metrics.get("completeness")
+        consistency = quality_metrics.get("consistency")
+        richness = quality_metrics.get("richness")
         
-        weights = {"completeness": 0.4, "consistency": 0.35, "richness": 0.25}
-        score = 0.0
-        
-        for metric, weight in weights.items():
-            if metric in quality_metrics:
-                score += quality_metrics[metric] * weight
+        # A partial set of metrics would silently under-weight the score
+        if completeness is None or consistency is None or richness is None:
+            return 0.0
         
-        return round(score, 2)
+        return round(completeness * 0.4 + consistency * 0.35 + richness * 0.25, 2)
     
-    def _calculate_data_health_index(self, quality_metrics: Dict[str, Any]) -> str:
+    def _calculate_data_health_index(self) -> str:
         """Calculate data health index"""
-        overall_score = self._calculate_overall_quality_score(quality_metrics)
-        
-        if overall_score >= 90:
-            return "Excellent"
-        elif overall_score >= 80:
-            return "Good"
-        elif overall_score >= 70:
-            return "Fair"
-        elif overall_score >= 60:
-            return "Poor"
-        else:
-            return "Critical"
+        return HEALTH_LABELS[bisect.bisect_right(QUALITY_THRESHOLDS, self._overall_quality or 0)]
     
     def _calculate_content_diversity(self) -> float:
         """Calculate content diversity score"""
-        if not self.analytics_data:
-            return 0.0
-        
         # Analyze content variety and uniqueness
-        content_lengths = self.analytics_data.get("analytics", {}).get("content_analysis", {})
-        if not content_lengths:
+        if not self._views.content:
             return 0.0
         
         # Simple diversity based on content length variance
-        avg_length = content_lengths.get("avg_length", 0)
+        avg_length = self._views.content.get("avg_length", 0)
         if avg_length == 0:
             return 0.0
         
@@ -167,28 +177,20 @@ class BusinessIntelligence:
     
     def _calculate_tag_coverage(self) -> float:
         """Calculate tag coverage percentage"""
-        if not self.analytics_data:
+        if not self._views.tags:
             return 0.0
         
-        tag_analysis = self.analytics_data.get("analytics", {}).get("tag_analysis", {})
-        if not tag_analysis:
-            return 0.0
-        
-        total_docs = self.analytics_data.get("summary", {}).get("total_documents", 1)
-        total_tags = tag_analysis.get("total_tags", 0)
+        total_docs = self._views.summary.get("total_documents", 0) or 1
+        total_tags = self._views.tags.get("total_tags", 0)
         
         coverage = (total_tags / total_docs) * 100
         return round(min(coverage, 100), 2)
     
     def _calculate_metadata_completeness(self) -> float:
         """Calculate metadata completeness percentage"""
-        if not self.analytics_data:
-            return 0.0
-        
         # This would analyze metadata field completion
         # For now, return a placeholder based on quality metrics
-        quality_metrics = self.analytics_data.get("analytics", {}).get("quality_metrics", {})
-        return quality_metrics.get("completeness", 0)
+        return self._views.quality.get("completeness", 0)
     
     def _calculate_processing_efficiency(self) -> float:
         """Calculate processing efficiency score"""
@@ -207,24 +209,22 @@ class BusinessIntelligence:
     
     def _assess_data_maturity(self) -> str:
         """Assess overall data maturity level"""
-        overall_score = self.bi_metrics.get("data_quality", {}).get("overall_score", 0)
-        
-        if overall_score >= 90:
-            return "Advanced"
-        elif overall_score >= 80:
-            return "Mature"
-        elif overall_score >= 70:
-            return "Developing"
-        elif overall_score >= 60:
-            return "Basic"
-        else:
-            return "Initial"
+        return MATURITY_LABELS[bisect.bisect_right(QUALITY_THRESHOLDS, self._overall_quality or 0)]
+    
+    def _materialize_strategic_insights(self):
+        """Fill the lazily computed strategic insights into bi_metrics"""
+        if self.bi_metrics:
+            self.bi_metrics["strategic_insights"].update(
+                improvement_opportunities=self.improvement_opportunities,
+                roi_metrics=self.roi_metrics
+            )
     
-    def _identify_improvement_opportunities(self) -> List[str]:
+    @cached_property
+    def improvement_opportunities(self) -> List[str]:
         """Identify key improvement opportunities"""
         opportunities = []
         
-        quality_metrics = self.bi_metrics.get("data_quality", {})
+        quality_metrics = self._views.quality
         
         if quality_metrics.get("completeness", 100) < 90:
             opportunities.append("Improve data completeness through better extraction processes")
@@ -235,8 +235,7 @@ class BusinessIntelligence:
         if quality_metrics.get("richness", 100) < 80:
             opportunities.append("Enrich content with additional metadata and tags")
         
-        content_richness = self.bi_metrics.get("content_richness", {})
-        if content_richness.get("tag_coverage", 100) < 2:
+        if self._calculate_tag_coverage() < 2:
             opportunities.append("Increase tagging coverage for better content organization")
         
         if not opportunities:
@@ -244,7 +243,8 @@ class BusinessIntelligence:
         
         return opportunities
     
-    def _calculate_roi_metrics(self) -> Dict[str, Any]:
+    @cached_property
+    def roi_metrics(self) -> Dict[str, Any]:
         """Calculate ROI and business value metrics"""
         # Placeholder for ROI calculations
         return {
@@ -254,28 +254,50 @@ class BusinessIntelligence:
             "operational_cost_reduction": "15%"
         }
     
-    def create_executive_dashboard(self) -> go.Figure:
+    def create_executive_dashboard(self) -> "go.Figure":
         """Create executive-level dashboard"""
+        # Plotly is only needed for the dashboard, so keep it off the import path
+        import numpy as np
+        import plotly.graph_objects as go
+        
         logger.info("Creating executive dashboard...")
         
-        # Create subplots
-        fig = make_subplots(
-            rows=3, cols=2,
-            subplot_titles=('Data Quality Overview', 'Content Distribution',
-                          'Operational KPIs', 'Strategic Insights',
-                          'Quality Metrics Trend', 'Improvement Roadmap'),
-            specs=[[{"type": "indicator"}, {"type": "pie"}],
-                   [{"type": "bar"}, {"type": "bar"}],
-                   [{"type": "bar"}, {"type": "scatter"}]]
-        )
+        # Fixed 3x2 grid laid out once up front instead of via make_subplots/add_trace
+        subplot_titles = (('Data Quality Overview', 'Content Distribution'),
+                          ('Operational KPIs', 'Strategic Insights'),
+                          ('Quality Metrics Trend', 'Improvement Roadmap'))
+        row_domains = ([7 / 9, 1.0], [7 / 18, 11 / 18], [0.0, 2 / 9])
+        col_domains = ([0.0, 0.45], [0.55, 1.0])
+        
+        layout = {
+            'title': {'text': "LLM Stack Business Intelligence Dashboard"},
+            'showlegend': False,
+            'height': 1000,
+            'template': "plotly_white",
+            'annotations': [
+                {'text': title, 'x': sum(col_domains[col]) / 2, 'y': row_domains[row][1],
+                 'xref': 'paper', 'yref': 'paper', 'xanchor': 'center', 'yanchor': 'bottom',
+                 'showarrow': False, 'font': {'size': 16}}
+                for row, titles in enumerate(subplot_titles)
+                for col, title in enumerate(titles)
+            ]
+        }
+        
+        # Rows 2-3 are cartesian; axes are numbered row-major (x, x2, x3, x4)
+        for axis, (row, col) in enumerate(((1, 0), (1, 1), (2, 0), (2, 1)), start=1):
+            suffix = str(axis) if axis > 1 else ''
+            layout[f'xaxis{suffix}'] = {'domain': col_domains[col], 'anchor': f'y{suffix}'}
+            layout[f'yaxis{suffix}'] = {'domain': row_domains[row], 'anchor': f'x{suffix}'}
+        
+        traces = []
         
         # 1. Data Quality Overview (Gauge Chart)
         overall_quality = self.bi_metrics.get("data_quality", {}).get("overall_score", 0)
-        fig.add_trace(
+        traces.append(
             go.Indicator(
                 mode="gauge+number+delta",
                 value=overall_quality,
-                domain={'x': [0, 1], 'y': [0, 1]},
+                domain={'x': col_domains[0], 'y': row_domains[0]},
                 title={'text': "Overall Data Quality"},
                 delta={'reference': 80},
                 gauge={
@@ -292,8 +314,7 @@ class BusinessIntelligence:
                         'value': 90
                     }
                 }
-            ),
-            row=1, col=1
+            )
         )
         
         # 2. Content Distribution (Pie Chart)
@@ -301,61 +322,54 @@ class BusinessIntelligence:
             doc_types = self.bi_metrics["data_volume"]["documents_per_type"]
             types = list(doc_types.keys())
             counts = list(doc_types.values())
-            fig.add_trace(
-                go.Pie(labels=types, values=counts, name="Document Types"),
-                row=1, col=2
+            traces.append(
+                go.Pie(labels=types, values=counts, name="Document Types",
+                      domain={'x': col_domains[1], 'y': row_domains[0]})
             )
         
         # 3. Operational KPIs (Bar Chart)
         operational_kpis = self.bi_metrics.get("operational_efficiency", {})
         if operational_kpis:
             kpi_names = list(operational_kpis.keys())
-            kpi_values = list(operational_kpis.values())
-            fig.add_trace(
-                go.Bar(x=kpi_names, y=kpi_values, name="Operational KPIs", marker_color='skyblue'),
-                row=2, col=1
+            kpi_values = np.asarray(list(operational_kpis.values()), dtype=np.float64)
+            traces.append(
+                go.Bar(x=kpi_names, y=kpi_values, name="Operational KPIs", marker_color='skyblue',
+                      xaxis='x', yaxis='y')
             )
         
         # 4. Strategic Insights (Bar Chart)
+        self._materialize_strategic_insights()
         strategic_insights = self.bi_metrics.get("strategic_insights", {})
         if strategic_insights:
             insight_names = list(strategic_insights.keys())
-            insight_values = [1 if v else 0 for v in strategic_insights.values()]  # Binary for now
-            fig.add_trace(
-                go.Bar(x=insight_names, y=insight_values, name="Strategic Insights", marker_color='gold'),
-                row=2, col=2
+            insight_values = np.asarray([1 if v else 0 for v in strategic_insights.values()], dtype=np.float64)  # Binary for now
+            traces.append(
+                go.Bar(x=insight_names, y=insight_values, name="Strategic Insights", marker_color='gold',
+                      xaxis='x2', yaxis='y2')
             )
         
         # 5. Quality Metrics Trend (Bar Chart)
         quality_metrics = self.bi_metrics.get("data_quality", {})
         if quality_metrics:
             metric_names = ['Completeness', 'Consistency', 'Richness']
-            metric_values = [
+            metric_values = np.asarray([
                 quality_metrics.get("completeness", 0),
                 quality_metrics.get("consistency", 0),
                 quality_metrics.get("richness", 0)
-            ]
-            fig.add_trace(
+            ], dtype=np.float64)
+            traces.append(
                 go.Bar(x=metric_names, y=metric_values, name="Quality Metrics", 
-                      marker_color=['#ff6b6b', '#4ecdc4', '#45b7d1']),
-                row=3, col=1
+                      marker_color=['#ff6b6b', '#4ecdc4', '#45b7d1'], xaxis='x3', yaxis='y3')
             )
         
         # 6. Improvement Roadmap (Scatter Plot)
         # Placeholder for improvement roadmap visualization
-        fig.add_trace(
-            go.Scatter(x=[1, 2, 3, 4], y=[60, 75, 85, 95], mode='lines+markers',
-                      name="Quality Improvement", line=dict(color='red', width=3)),
-            row=3, col=2
+        traces.append(
+            go.Scatter(x=np.arange(1, 5, dtype=np.float64), y=np.asarray([60, 75, 85, 95], dtype=np.float64), mode='lines+markers',
+                      name="Quality Improvement", line=dict(color='red', width=3), xaxis='x4', yaxis='y4')
         )
         
-        # Update layout
-        fig.update_layout(
-            title_text="LLM Stack Business Intelligence Dashboard",
-            showlegend=False,
-            height=1000,
-            template="plotly_white"
-        )
+        fig = go.Figure(data=traces, layout=layout)
         
         return fig
     
@@ -366,6 +380,8 @@ class BusinessIntelligence:
         if not self.bi_metrics:
             self.calculate_kpis()
         
+        self._materialize_strategic_insights()
+        
         report = {
             "executive_summary": {
                 "overall_quality_score": self.bi_metrics.get("data_quality", {}).get("overall_score", 0),
@@ -374,14 +390,15 @@ class BusinessIntelligence:
                 "data_health_status": self.bi_metrics.get("data_quality", {}).get("data_health_index", "Unknown")
             },
             "kpi_analysis": self.bi_metrics,
-            "strategic_recommendations": self._generate_strategic_recommendations(),
-            "action_items": self._generate_action_items(),
-            "generated_at": datetime.utcnow().isoformat()
+            "strategic_recommendations": self.strategic_recommendations,
+            "action_items": self.action_items,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec='seconds')
         }
         
         return report
     
-    def _generate_strategic_recommendations(self) -> List[Dict[str, Any]]:
+    @cached_property
+    def strategic_recommendations(self) -> List[Dict[str, Any]]:
         """Generate strategic recommendations"""
         recommendations = []
         
@@ -429,7 +446,8 @@ class BusinessIntelligence:
         
         return recommendations
     
-    def _generate_action_items(self) -> List[Dict[str, Any]]:
+    @cached_property
+    def action_items(self) -> List[Dict[str, Any]]:
         """Generate actionable items"""
         action_items = []
         
@@ -465,12 +483,30 @@ class BusinessIntelligence:
         
         return action_items
 
+def _dumps_indented(obj: Any) -> bytes:
+    """Serialize to JSON bytes indented by two spaces"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def write_bi_report(report: Dict[str, Any], report_file: Path):
+    """Write the BI report one top-level section at a time to bound peak memory"""
+    with open(report_file, 'wb') as f:
+        f.write(b'{')
+        for i, (key, value) in enumerate(report.items()):
+            f.write(b',\n  ' if i else b'\n  ')
+            # Nest each section one level so the file matches a whole-report indent
+            f.write(_dumps_indented(key) + b': ' + _dumps_indented(value).replace(b'\n', b'\n  '))
+        f.write(b'\n}' if report else b'}')
+
 def main():
     parser = argparse.ArgumentParser(description='LLM Stack Business Intelligence')
     parser.add_argument('--analytics-dir', default='analytics-output',
                        help='Analytics output directory')
     parser.add_argument('--output-dir', default='bi-output',
                        help='BI output directory')
+    parser.add_argument('--dashboard', action='store_true',
+                       help='Also render the Plotly HTML executive dashboard')
     
     args = parser.parse_args()
     
@@ -494,22 +530,25 @@ def main():
         output_dir.mkdir(parents=True, exist_ok=True)
         
         report_file = output_dir / "bi-report.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_bi_report(report, report_file)
         
-        # Create dashboard
-        dashboard = bi.create_executive_dashboard()
-        dashboard_file = output_dir / "executive-dashboard.html"
-        dashboard.write_html(str(dashboard_file))
+        # Create dashboard (optional - Plotly is never imported without it)
+        dashboard_file = None
+        if args.dashboard:
+            dashboard = bi.create_executive_dashboard()
+            dashboard_file = output_dir / "executive-dashboard.html"
+            # Load plotly.js from the CDN instead of inlining ~3 MB into every report
+            dashboard.write_html(str(dashboard_file), include_plotlyjs='cdn', full_html=True)
         
         print("✅ Business Intelligence report generated successfully!")
         print(f"📊 Report: {report_file}")
-        print(f"📈 Dashboard: {dashboard_file}")
+        if dashboard_file:
+            print(f"📈 Dashboard: {dashboard_file}")
         
         return 0
         
     except Exception as e:
-        logger.error(f"Business Intelligence failed: {e}")
+        logger.error("Business Intelligence failed: %s", e)
         return 1
 
 if __name__ == "__main__":
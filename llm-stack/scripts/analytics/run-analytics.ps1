@@ -82,7 +82,7 @@ function Run-BusinessIntelligence {
     Write-Host "BI output directory: $BIDir" -ForegroundColor Cyan
     
     try {
-        python business-intelligence.py --analytics-dir $OutputDir --output-dir $BIDir
+        python business-intelligence.py --analytics-dir $OutputDir --output-dir $BIDir --dashboard
         $exitCode = $LASTEXITCODE
         if ($exitCode -eq 0) {
             Write-Host ""
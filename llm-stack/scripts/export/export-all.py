@@ -13,6 +13,7 @@ from pathlib import Path
 import logging
 import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the export scripts to the path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -32,100 +33,103 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Write buffer size for the combined dataset
+COPY_BUFFER_SIZE = 1 << 20
+
 class CombinedExporter:
     def __init__(self, output_dir="exports"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # One timestamp per run so all output files share a suffix; paths are built once
+        self.run_ts = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.paperless_file = self.output_dir / f"paperless-export-{self.run_ts}.jsonl"
+        self.photoprism_file = self.output_dir / f"photoprism-export-{self.run_ts}.jsonl"
+        self.combined_file = self.output_dir / f"combined-dataset-{self.run_ts}.jsonl"
+        
         # Initialize exporters
         self.paperless_exporter = PaperlessExporter()
         self.photoprism_exporter = PhotoPrismExporter()
         
-        logger.info(f"Initialized combined exporter with output directory: {self.output_dir}")
+        logger.info("Initialized combined exporter with output directory: %s", self.output_dir)
     
-    def export_paperless(self, limit=100):
-        """Export documents from Paperless"""
-        output_file = self.output_dir / f"paperless-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+    def export_paperless(self, limit=100, fileobj=None):
+        """Export documents from Paperless, into fileobj when given"""
+        output_file = self.paperless_file if fileobj is None else None
         
         logger.info("Starting Paperless document export...")
         try:
-            count = self.paperless_exporter.export_to_jsonl(str(output_file), limit)
-            logger.info(f"Paperless export complete: {count} documents")
+            count = self.paperless_exporter.export_to_jsonl(str(output_file) if output_file else None, limit, fileobj=fileobj)
+            logger.info("Paperless export complete: %s documents", count)
             return output_file, count
         except Exception as e:
-            logger.error(f"Paperless export failed: {e}")
+            logger.error("Paperless export failed: %s", e)
+            # A shared fileobj may now hold partial records; the caller has to know
+            if fileobj is not None:
+                raise
             return None, 0
     
-    def export_photoprism(self, limit=100):
-        """Export photos from PhotoPrism"""
-        output_file = self.output_dir / f"photoprism-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+    def export_photoprism(self, limit=100, fileobj=None):
+        """Export photos from PhotoPrism, into fileobj when given"""
+        output_file = self.photoprism_file if fileobj is None else None
         
         logger.info("Starting PhotoPrism photo export...")
         try:
-            count = self.photoprism_exporter.export_to_jsonl(str(output_file), limit)
-            logger.info(f"PhotoPrism export complete: {count} photos")
+            count = self.photoprism_exporter.export_to_jsonl(str(output_file) if output_file else None, limit, fileobj=fileobj)
+            logger.info("PhotoPrism export complete: %s photos", count)
             return output_file, count
         except Exception as e:
-            logger.error(f"PhotoPrism export failed: {e}")
+            logger.error("PhotoPrism export failed: %s", e)
+            # A shared fileobj may now hold partial records; the caller has to know
+            if fileobj is not None:
+                raise
             return None, 0
     
-    def create_combined_dataset(self, paperless_file, photoprism_file):
-        """Create a combined dataset from both exports"""
-        if not paperless_file or not photoprism_file:
-            logger.warning("Cannot create combined dataset - missing export files")
-            return None
-        
-        combined_file = self.output_dir / f"combined-dataset-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
-        
-        logger.info("Creating combined dataset...")
-        
-        total_count = 0
-        with open(combined_file, 'w', encoding='utf-8') as outfile:
-            # Add Paperless documents
-            if paperless_file.exists():
-                with open(paperless_file, 'r', encoding='utf-8') as infile:
-                    for line in infile:
-                        outfile.write(line)
-                        total_count += 1
-            
-            # Add PhotoPrism photos
-            if photoprism_file.exists():
-                with open(photoprism_file, 'r', encoding='utf-8') as infile:
-                    for line in infile:
-                        outfile.write(line)
-                        total_count += 1
-        
-        logger.info(f"Combined dataset created: {total_count} total items")
-        return combined_file, total_count
-    
     def export_all(self, limit=100):
         """Export all data from both services"""
-        logger.info(f"Starting comprehensive export (limit: {limit} per service)...")
-        
-        # Export from Paperless
-        paperless_file, paperless_count = self.export_paperless(limit)
+        logger.info("Starting comprehensive export (limit: %s per service)...", limit)
+        
+        # Stream both services straight into the combined dataset instead of writing
+        # per-service files and re-reading them. The exports are network-bound against
+        # different services, so overlap them; BufferedWriter is internally locked and
+        # each exporter writes whole lines, so sharing the output file is safe.
+        combined_file = self.combined_file
+        with open(combined_file, 'wb', buffering=COPY_BUFFER_SIZE) as outfile:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                paperless_future = executor.submit(self.export_paperless, limit, outfile)
+                photoprism_future = executor.submit(self.export_photoprism, limit, outfile)
+            
+            failed = [name for name, future in (('Paperless', paperless_future), ('PhotoPrism', photoprism_future))
+                      if future.exception() is not None]
+            paperless_file, paperless_count = (None, 0) if paperless_future.exception() else paperless_future.result()
+            photoprism_file, photoprism_count = (None, 0) if photoprism_future.exception() else photoprism_future.result()
+            
+            outfile.flush()
+            os.fsync(outfile.fileno())
         
-        # Export from PhotoPrism
-        photoprism_file, photoprism_count = self.export_photoprism(limit)
+        # A failed export can leave partial records behind, so no combined dataset is kept
+        if failed:
+            logger.warning("Discarding combined dataset - export failed for: %s", ', '.join(failed))
+            combined_file.unlink()
+            combined_file = None
         
-        # Create combined dataset
-        combined_file, total_count = self.create_combined_dataset(paperless_file, photoprism_file)
+        total_count = paperless_count + photoprism_count
         
         # Summary
         logger.info("=" * 50)
         logger.info("EXPORT SUMMARY")
         logger.info("=" * 50)
-        logger.info(f"Paperless documents: {paperless_count}")
-        logger.info(f"PhotoPrism photos: {photoprism_count}")
-        logger.info(f"Total items: {total_count}")
-        logger.info(f"Output directory: {self.output_dir}")
+        logger.info("Paperless documents: %s", paperless_count)
+        logger.info("PhotoPrism photos: %s", photoprism_count)
+        logger.info("Total items: %s", total_count)
+        logger.info("Output directory: %s", self.output_dir)
         
         if paperless_file:
-            logger.info(f"Paperless export: {paperless_file}")
+            logger.info("Paperless export: %s", paperless_file)
         if photoprism_file:
-            logger.info(f"PhotoPrism export: {photoprism_file}")
+            logger.info("PhotoPrism export: %s", photoprism_file)
         if combined_file:
-            logger.info(f"Combined dataset: {combined_file}")
+            logger.info("Combined dataset: %s", combined_file)
         
         logger.info("=" * 50)
         
@@ -169,7 +173,7 @@ def main():
         return 0
         
     except Exception as e:
-        logger.error(f"Export process failed: {e}")
+        logger.error("Export process failed: %s", e)
         return 1
 
 if __name__ == "__main__":
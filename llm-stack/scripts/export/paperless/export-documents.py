@@ -7,30 +7,201 @@ Usage:
     python export-documents.py [--output output.jsonl] [--limit 100]
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import msgspec
+import orjson
 import argparse
+import random
 import sys
-from datetime import datetime
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from typing import List, Optional
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Optional on-disk cache of per-item API responses between export runs
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+CACHE_DIR = Path.home() / ".cache" / "searchmyfiles" / "export"
+CACHE_TTL = 24 * 60 * 60
+
+# Upper bound on in-flight requests to the Paperless API (one per consumer)
+MAX_CONCURRENT_REQUESTS = 64
+
+# Generous per-request timeout in seconds; text for large documents can be slow to serve
+REQUEST_TIMEOUT = 300
+
+# Requests per second allowed against the API (0 disables the limiter)
+RATE_LIMIT = 20
+
+# Throttled/unavailable responses are retried with exponential backoff plus jitter,
+# waiting at most RETRY_BACKOFF_MAX seconds between attempts
+RETRY_STATUSES = (429, 502, 503, 504)
+MAX_RETRIES = 5
+RETRY_BACKOFF_BASE = 1
+RETRY_BACKOFF_MAX = 60
+
+# Documents requested per list page, and bound on records waiting in each queue
+PAGE_SIZE = 100
+QUEUE_SIZE = 256
+
+# Related objects are exported by name and tags as a list of names; the other
+# metadata fields are copied from the document as-is
+DOCUMENT_RELATED_FIELDS = ('correspondent', 'document_type', 'storage_path')
+DOCUMENT_COPIED_FIELDS = (
+    'created_date', 'added', 'modified', 'archive_filename', 'original_filename', 'checksum',
+    'file_size', 'page_count', 'language', 'archive_serial_number'
+)
+
+# API endpoint listing the names behind each related id on a document
+RELATED_ENDPOINTS = {
+    'correspondent': 'correspondents',
+    'tags': 'tags',
+    'document_type': 'document_types',
+    'storage_path': 'storage_paths'
+}
+
+# Records serialized per write() call
+WRITE_BATCH_SIZE = 256
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5
+
+class DocumentMetadata(msgspec.Struct, kw_only=True):
+    """Metadata of an exported document; field order is the output key order"""
+    created_date: Optional[str] = None
+    added: Optional[str] = None
+    modified: Optional[str] = None
+    correspondent: Optional[str] = None
+    tags: List[str] = []
+    document_type: Optional[str] = None
+    storage_path: Optional[str] = None
+    archive_filename: Optional[str] = None
+    original_filename: Optional[str] = None
+    checksum: Optional[str] = None
+    file_size: Optional[int] = None
+    page_count: Optional[int] = None
+    language: Optional[str] = None
+    archive_serial_number: Optional[int] = None
+
+class DocumentRecord(msgspec.Struct, kw_only=True):
+    """One exported document, encoded as a JSONL line"""
+    id: str
+    source: str = "paperless"
+    type: str = "document"
+    title: Optional[str]
+    content: str
+    metadata: DocumentMetadata
+    extracted_at: datetime
+
+# Records are encoded straight from the structs; aware UTC datetimes are emitted as "...Z"
+encoder = msgspec.json.Encoder()
+
+def retry_delay(response, attempt):
+    """Seconds to wait before retrying: the server's Retry-After if given, else backoff"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt)
+    return backoff + random.uniform(0, RETRY_BACKOFF_BASE)
+
+def related_name(value, names):
+    """Name of a related object given either as an id or as a nested object"""
+    if isinstance(value, dict):
+        return value.get('name')
+    return names.get(value)
+
+class AsyncTokenBucket:
+    """Token bucket shared by all tasks, allowing `rate` requests per second"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        # A burst of at least one token, so rates below 1/s still let requests through
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def non_negative_rate(value):
+    """argparse type for --rate-limit: requests per second, 0 or more"""
+    rate = float(value)
+    if not rate >= 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return rate
+
 class PaperlessExporter:
-    def __init__(self, base_url="http://localhost:8321", api_token=None):
+    def __init__(self, base_url="http://localhost:8321", api_token=None, use_cache=True, rate_limit=RATE_LIMIT):
         self.base_url = base_url.rstrip('/')
         self.api_token = api_token
-        self.session = requests.Session()
+        self.headers = {'Authorization': f'Token {api_token}'} if api_token else {}
+        self.cache = Cache(str(CACHE_DIR)) if use_cache and DISKCACHE_AVAILABLE else None
+        self.rate_limit = rate_limit
         
-        if api_token:
-            self.session.headers.update({'Authorization': f'Token {api_token}'})
+        # Pooled connections belong to the event loop that opened them, so the
+        # client and limiter are created per export run
+        self.client = None
+        self.limiter = None
         
-        # Test connection
+        # id -> name for each related field, loaded once per export run
+        self.related_names = {field: {} for field in RELATED_ENDPOINTS}
+    
+    async def request(self, url, retries=MAX_RETRIES, **kwargs):
+        """GET through the rate limiter, retrying throttled responses and transport errors"""
+        for attempt in range(retries + 1):
+            if self.limiter:
+                await self.limiter.acquire()
+            
+            try:
+                response = await self.client.get(url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise
+                response = None
+                reason = str(e) or type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+                reason = f"status {response.status_code}"
+            
+            delay = retry_delay(response, attempt)
+            logger.warning(f"Request to {url} failed ({reason}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def check_connection(self):
+        """Test the connection to the Paperless API"""
         try:
-            response = self.session.get(f"{self.base_url}/api/")
+            # One attempt, so an unreachable server is reported at once instead of after the retry backoff
+            response = await self.request(f"{self.base_url}/api/", retries=0)
             if response.status_code == 200:
                 logger.info(f"Connected to Paperless at {self.base_url}")
             else:
@@ -38,35 +209,64 @@ class PaperlessExporter:
         except Exception as e:
             logger.error(f"Failed to connect to Paperless: {e}")
     
-    def get_documents(self, limit=100, offset=0):
-        """Fetch documents from Paperless API"""
-        try:
-            url = f"{self.base_url}/api/documents/"
-            params = {
-                'limit': limit,
-                'offset': offset,
-                'ordering': '-created'
-            }
-            
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
+    async def iter_documents(self, max_items=None):
+        """Yield documents from Paperless API, newest first"""
+        params = {
+            'page_size': min(PAGE_SIZE, max_items) if max_items else PAGE_SIZE,
+            'ordering': '-created'
+        }
+        async for doc in self.iter_results('documents', params, max_items):
+            yield doc
+    
+    async def load_related_names(self):
+        """Fetch the id -> name maps for tags, correspondents, document types and storage paths"""
+        async def load(endpoint):
+            return {item['id']: item.get('name') async for item in self.iter_results(endpoint, {'page_size': PAGE_SIZE})}
+        
+        names = await asyncio.gather(*(load(endpoint) for endpoint in RELATED_ENDPOINTS.values()))
+        self.related_names = dict(zip(RELATED_ENDPOINTS, names))
+    
+    async def iter_results(self, endpoint, params, max_items=None):
+        """Yield results from a paginated API endpoint, following `next` links until exhausted"""
+        url = f"{self.base_url}/api/{endpoint}/"
+        yielded = 0
+        
+        while url and not (max_items and yielded >= max_items):
+            try:
+                response = await self.request(url, params=params)
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+            except Exception as e:
+                logger.error(f"Failed to fetch {endpoint}: {e}")
+                return
             
-            data = response.json()
-            logger.info(f"Retrieved {len(data.get('results', []))} documents")
-            return data.get('results', [])
+            results = data.get('results', [])
+            logger.info(f"Retrieved {len(results)} {endpoint}")
+            for item in results[:max_items - yielded] if max_items else results:
+                yield item
+                yielded += 1
             
-        except Exception as e:
-            logger.error(f"Failed to fetch documents: {e}")
-            return []
+            # The next link already carries the page and query parameters
+            url, params = data.get('next'), None
     
-    def get_document_content(self, doc_id):
-        """Fetch document text content"""
+    async def get_document_content(self, doc_id, checksum=None):
+        """Fetch document text content, cached per document checksum"""
+        # The checksum changes with the file, so a stale entry is never hit
+        cache_key = f"paperless:{doc_id}:{checksum}" if self.cache is not None and checksum else None
+        if cache_key:
+            content = self.cache.get(cache_key)
+            if content is not None:
+                return content
+        
         try:
             url = f"{self.base_url}/api/documents/{doc_id}/text/"
-            response = self.session.get(url)
+            response = await self.request(url)
             
             if response.status_code == 200:
-                return response.text.strip()
+                content = response.text.strip()
+                if cache_key:
+                    self.cache.set(cache_key, content, expire=CACHE_TTL)
+                return content
             else:
                 logger.warning(f"Could not fetch content for document {doc_id}")
                 return ""
@@ -75,62 +275,135 @@ class PaperlessExporter:
             logger.error(f"Failed to fetch content for document {doc_id}: {e}")
             return ""
     
-    def normalize_document(self, doc):
+    async def normalize_document(self, doc, extracted_at=None):
         """Convert Paperless document to normalized format"""
         try:
             # Extract text content
-            content = self.get_document_content(doc['id'])
+            content = await self.get_document_content(doc['id'], doc.get('checksum'))
             
-            # Normalize document data
-            normalized = {
-                "id": f"paperless_{doc['id']}",
-                "source": "paperless",
-                "type": "document",
-                "title": doc.get('title', 'Untitled'),
-                "content": content,
-                "metadata": {
-                    "created_date": doc.get('created_date'),
-                    "added": doc.get('added'),
-                    "modified": doc.get('modified'),
-                    "correspondent": doc.get('correspondent', {}).get('name') if doc.get('correspondent') else None,
-                    "tags": [tag['name'] for tag in doc.get('tags', [])],
-                    "document_type": doc.get('document_type', {}).get('name') if doc.get('document_type') else None,
-                    "storage_path": doc.get('storage_path', {}).get('name') if doc.get('storage_path') else None,
-                    "archive_filename": doc.get('archive_filename'),
-                    "original_filename": doc.get('original_filename'),
-                    "checksum": doc.get('checksum'),
-                    "file_size": doc.get('file_size'),
-                    "page_count": doc.get('page_count'),
-                    "language": doc.get('language'),
-                    "archive_serial_number": doc.get('archive_serial_number')
-                },
-                "extracted_at": datetime.utcnow().isoformat()
-            }
+            # Build metadata from the field tables
+            fields = {key: doc.get(key) for key in DOCUMENT_COPIED_FIELDS}
+            # Related objects arrive as ids unless the server expanded them
+            for key in DOCUMENT_RELATED_FIELDS:
+                related = doc.get(key)
+                if related:
+                    fields[key] = related_name(related, self.related_names[key])
+            tag_names = self.related_names['tags']
+            fields['tags'] = [
+                name for name in (related_name(tag, tag_names) for tag in doc.get('tags', [])) if name
+            ]
             
-            return normalized
+            # Normalize document data
+            return DocumentRecord(
+                id=f"paperless_{doc['id']}",
+                title=doc.get('title', 'Untitled'),
+                content=content,
+                metadata=DocumentMetadata(**fields),
+                extracted_at=extracted_at or datetime.now(timezone.utc)
+            )
             
         except Exception as e:
             logger.error(f"Failed to normalize document {doc.get('id')}: {e}")
             return None
     
-    def export_to_jsonl(self, output_file, limit=100):
-        """Export documents to JSONL format"""
+    def export_to_jsonl(self, output_file=None, limit=100, fileobj=None):
+        """Export documents to JSONL format, into fileobj (opened 'wb') when given"""
+        return asyncio.run(self.export_to_jsonl_async(output_file, limit, fileobj))
+    
+    async def export_to_jsonl_async(self, output_file=None, limit=100, fileobj=None):
+        """Export documents to JSONL format through a list -> text fetch -> write pipeline"""
         logger.info(f"Starting export of up to {limit} documents...")
         
-        documents = self.get_documents(limit=limit)
-        exported_count = 0
+        # HTTP/2 multiplexes the per-document requests over one connection (negotiated over TLS)
+        limits = httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS, max_keepalive_connections=MAX_CONCURRENT_REQUESTS)
+        async with httpx.AsyncClient(http2=True, headers=self.headers, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+            self.client = client
+            self.limiter = AsyncTokenBucket(self.rate_limit) if self.rate_limit else None
+            await self.check_connection()
+            await self.load_related_names()
+            
+            # One timestamp for the whole export run
+            extracted_at = datetime.now(timezone.utc)
+            doc_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+            write_queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+            
+            with (open(output_file, 'wb') if fileobj is None else nullcontext(fileobj)) as f:
+                writer = asyncio.create_task(self._write_records(write_queue, f))
+                consumers = [
+                    asyncio.create_task(self._normalize_documents(doc_queue, write_queue, extracted_at))
+                    for _ in range(MAX_CONCURRENT_REQUESTS)
+                ]
+                
+                # List pages keep being fetched while earlier documents' text is in flight
+                feeder = asyncio.create_task(self._feed_documents(doc_queue, limit))
+                tasks = [feeder, *consumers]
+                try:
+                    # The writer only finishes before the None sentinel by failing, and then
+                    # nothing drains write_queue, so the feed is raced against it
+                    await asyncio.wait([feeder, writer], return_when=asyncio.FIRST_COMPLETED)
+                    if writer.done():
+                        writer.result()
+                    feeder.result()
+                except BaseException:
+                    tasks.append(writer)
+                    raise
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                
+                await write_queue.put(None)
+                exported_count = await writer
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for doc in documents:
-                normalized = self.normalize_document(doc)
+        logger.info(f"Export complete: {exported_count} documents written to {output_file or 'stream'}")
+        return exported_count
+    
+    async def _feed_documents(self, doc_queue, limit):
+        """Queue every document and wait until the consumers have processed them all"""
+        await self._queue_documents(doc_queue, limit)
+        await doc_queue.join()
+    
+    async def _queue_documents(self, doc_queue, limit):
+        """Producer: page through the document list and queue each document"""
+        async for doc in self.iter_documents(max_items=limit):
+            await doc_queue.put(doc)
+    
+    async def _normalize_documents(self, doc_queue, write_queue, extracted_at):
+        """Consumer: fetch text for queued documents and pass serialized records to the writer"""
+        while True:
+            doc = await doc_queue.get()
+            try:
+                normalized = await self.normalize_document(doc, extracted_at)
                 if normalized:
-                    f.write(json.dumps(normalized, ensure_ascii=False) + '\n')
-                    exported_count += 1
-                    
-                    if exported_count % 10 == 0:
-                        logger.info(f"Exported {exported_count} documents...")
+                    await write_queue.put(encoder.encode(normalized) + b'\n')
+            finally:
+                doc_queue.task_done()
+    
+    async def _write_records(self, write_queue, f):
+        """Single writer: drain serialized records to the output until the None sentinel"""
+        exported_count = 0
+        
+        # Records are written in batches of whole lines, one write() each, which keeps
+        # lines intact when fileobj is shared between exporters
+        batch = []
+        next_progress = time.monotonic() + PROGRESS_INTERVAL
+        while True:
+            record = await write_queue.get()
+            if record is None:
+                break
+            
+            batch.append(record)
+            exported_count += 1
+            
+            if len(batch) == WRITE_BATCH_SIZE:
+                f.write(b''.join(batch))
+                batch.clear()
+            
+            if time.monotonic() >= next_progress:
+                logger.info(f"Exported {exported_count} documents...")
+                next_progress = time.monotonic() + PROGRESS_INTERVAL
         
-        logger.info(f"Export complete: {exported_count} documents written to {output_file}")
+        f.write(b''.join(batch))
         return exported_count
 
 def main():
@@ -143,6 +416,10 @@ def main():
                        help='Paperless base URL')
     parser.add_argument('--token',
                        help='Paperless API token (optional)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always re-fetch document text instead of using the on-disk cache')
+    parser.add_argument('--rate-limit', type=non_negative_rate, default=RATE_LIMIT,
+                       help='Maximum API requests per second (0 for no limit)')
     
     args = parser.parse_args()
     
@@ -151,7 +428,8 @@ def main():
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Initialize exporter
-    exporter = PaperlessExporter(args.url, args.token)
+    exporter = PaperlessExporter(args.url, args.token, use_cache=not args.no_cache,
+                                 rate_limit=args.rate_limit)
     
     # Export documents
     try:
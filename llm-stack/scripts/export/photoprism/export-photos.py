@@ -8,29 +8,218 @@ Usage:
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import msgspec
+import orjson
 import argparse
+import random
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice, repeat
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from typing import Any, List, Optional
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Optional on-disk cache of per-item API responses between export runs
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+CACHE_DIR = Path.home() / ".cache" / "searchmyfiles" / "export"
+CACHE_TTL = 24 * 60 * 60
+
+# Keep-alive connections pooled per host; sized for parallel detail fetches
+MAX_CONCURRENT_REQUESTS = 64
+
+# Requests per second allowed against the API (0 disables the limiter)
+RATE_LIMIT = 20
+
+# Throttled/unavailable responses are retried with exponential backoff plus jitter,
+# waiting at most RETRY_BACKOFF_MAX seconds between attempts
+RETRY_STATUSES = (429, 502, 503, 504)
+MAX_RETRIES = 5
+RETRY_BACKOFF_BASE = 1
+RETRY_BACKOFF_MAX = 60
+
+# Photos requested per list page
+PAGE_SIZE = 100
+
+# PhotoPrism fields summarized into the record content, in order
+PHOTO_CONTENT_FIELDS = ('Description', 'Title', 'Subject', 'Artist')
+
+# (metadata key, PhotoPrism field, default) copied into the metadata; location, labels,
+# faces and albums are built by normalize_photo
+PHOTO_FIELDS = (
+    ('filename', 'FileName', None),
+    ('original_name', 'OriginalName', None),
+    ('hash', 'PhotoUID', None),
+    ('file_size', 'FileSize', None),
+    ('width', 'Width', None),
+    ('height', 'Height', None),
+    ('taken_at', 'TakenAt', None),
+    ('created_at', 'CreatedAt', None),
+    ('updated_at', 'UpdatedAt', None),
+    ('camera', 'CameraModel', None),
+    ('lens', 'LensModel', None),
+    ('focal_length', 'FocalLength', None),
+    ('aperture', 'Aperture', None),
+    ('iso', 'Iso', None),
+    ('exposure', 'Exposure', None),
+    ('flash', 'Flash', None),
+    ('tags', 'Tags', ()),
+    ('color', 'Color', None),
+    ('type', 'Type', None),
+    ('mime_type', 'MimeType', None),
+    ('video', 'Video', False),
+    ('favorite', 'Favorite', False),
+    ('private', 'Private', False),
+    ('scan', 'Scan', False),
+    ('panorama', 'Panorama', False)
+)
+
+# (location key, PhotoPrism field)
+PHOTO_LOCATION_FIELDS = (
+    ('latitude', 'Lat'),
+    ('longitude', 'Lng'),
+    ('altitude', 'Altitude'),
+    ('place', 'Place')
+)
+
+# Records serialized per write() call
+WRITE_BATCH_SIZE = 256
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5
+
+class PhotoLocation(msgspec.Struct, kw_only=True):
+    """GPS position and place name of an exported photo"""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    altitude: Optional[float] = None
+    place: Optional[str] = None
+
+class PhotoMetadata(msgspec.Struct, kw_only=True):
+    """Metadata of an exported photo; field order is the output key order"""
+    filename: Optional[str] = None
+    original_name: Optional[str] = None
+    hash: Optional[str] = None
+    file_size: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    taken_at: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    camera: Optional[str] = None
+    lens: Optional[str] = None
+    focal_length: Optional[float] = None
+    aperture: Optional[float] = None
+    iso: Optional[int] = None
+    exposure: Optional[str] = None
+    flash: Optional[bool] = None
+    location: PhotoLocation
+    labels: List[str] = []
+    faces: List[str] = []
+    tags: List[Any] = []
+    albums: List[Optional[str]] = []
+    color: Optional[str] = None
+    type: Optional[str] = None
+    mime_type: Optional[str] = None
+    video: bool = False
+    favorite: bool = False
+    private: bool = False
+    scan: bool = False
+    panorama: bool = False
+
+class PhotoRecord(msgspec.Struct, kw_only=True):
+    """One exported photo, encoded as a JSONL line"""
+    id: str
+    source: str = "photoprism"
+    type: str = "photo"
+    title: Optional[str]
+    content: str
+    metadata: PhotoMetadata
+    extracted_at: datetime
+
+# Records are encoded straight from the structs; aware UTC datetimes are emitted as "...Z"
+encoder = msgspec.json.Encoder()
+
+def retry_delay(response, attempt):
+    """Seconds to wait before retrying: the server's Retry-After if given, else backoff"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt)
+    return backoff + random.uniform(0, RETRY_BACKOFF_BASE)
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        # A burst of at least one token, so rates below 1/s still let requests through
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and take it"""
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+def non_negative_rate(value):
+    """argparse type for --rate-limit: requests per second, 0 or more"""
+    rate = float(value)
+    if not rate >= 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return rate
+
 class PhotoPrismExporter:
-    def __init__(self, base_url="http://localhost:2342", api_key=None):
+    def __init__(self, base_url="http://localhost:2342", api_key=None, use_cache=True, rate_limit=RATE_LIMIT):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.session = requests.Session()
+        self.cache = Cache(str(CACHE_DIR)) if use_cache and DISKCACHE_AVAILABLE else None
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        
+        # Only the PhotoPrism host is contacted, so one pool of reusable connections is enough;
+        # status retries are handled by request()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         if api_key:
             self.session.headers.update({'X-Session-Token': api_key})
         
-        # Test connection
+        # Test connection with one attempt, so an unreachable server is reported at once
+        # instead of after the retry backoff
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/status")
+            response = self.request(f"{self.base_url}/api/v1/status", retries=0)
             if response.status_code == 200:
                 logger.info(f"Connected to PhotoPrism at {self.base_url}")
             else:
@@ -38,36 +227,101 @@ class PhotoPrismExporter:
         except Exception as e:
             logger.error(f"Failed to connect to PhotoPrism: {e}")
     
+    def request(self, url, retries=MAX_RETRIES, **kwargs):
+        """GET through the rate limiter, retrying throttled responses and connection errors"""
+        for attempt in range(retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                response = None
+                reason = str(e) or type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+                reason = f"status {response.status_code}"
+            
+            delay = retry_delay(response, attempt)
+            logger.warning(f"Request to {url} failed ({reason}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
     def get_photos(self, limit=100, offset=0):
-        """Fetch photos from PhotoPrism API"""
+        """Fetch photos from PhotoPrism API, revalidating cached pages with ETag / Last-Modified"""
         try:
             url = f"{self.base_url}/api/v1/photos"
             params = {
                 'count': limit,
                 'offset': offset,
-                'order': 'newest'
+                'order': 'newest',
+                'merged': 'true'
             }
             
-            response = self.session.get(url, params=params)
+            # A cached page is only reused after the server answers 304 Not Modified
+            cache_key = f"photoprism:page:{offset}:{limit}" if self.cache is not None else None
+            cached = self.cache.get(cache_key) if cache_key else None
+            headers = {}
+            if cached:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            response = self.request(url, params=params, headers=headers)
+            if response.status_code == 304 and cached:
+                photos = cached['photos']
+                logger.info(f"Photos page at offset {offset} not modified, reusing {len(photos)} cached photos")
+                return photos
             response.raise_for_status()
             
-            data = response.json()
-            photos = data.get('photos', [])
+            data = orjson.loads(response.content)
+            # The search API returns a bare list; older wrappers nest it under 'photos'
+            photos = data if isinstance(data, list) else data.get('photos', [])
             logger.info(f"Retrieved {len(photos)} photos")
+            
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if cache_key and (etag or last_modified):
+                page = {'etag': etag, 'last_modified': last_modified, 'photos': photos}
+                self.cache.set(cache_key, page, expire=CACHE_TTL)
             return photos
             
         except Exception as e:
             logger.error(f"Failed to fetch photos: {e}")
             return []
     
-    def get_photo_details(self, photo_id):
-        """Fetch detailed photo information"""
+    def iter_photos(self, max_items=None):
+        """Yield photos from PhotoPrism API, paging by offset until a short page"""
+        offset = 0
+        while not (max_items and offset >= max_items):
+            count = min(PAGE_SIZE, max_items - offset) if max_items else PAGE_SIZE
+            photos = self.get_photos(limit=count, offset=offset)
+            yield from photos
+            
+            if len(photos) < count:
+                break
+            offset += count
+    
+    def get_photo_details(self, photo_id, photo_uid=None):
+        """Fetch detailed photo information, cached per photo UID"""
+        cache_key = f"photoprism:{photo_id}:{photo_uid}" if self.cache is not None and photo_uid else None
+        if cache_key:
+            details = self.cache.get(cache_key)
+            if details is not None:
+                return details
+        
         try:
             url = f"{self.base_url}/api/v1/photos/{photo_id}"
-            response = self.session.get(url)
+            response = self.request(url)
             
             if response.status_code == 200:
-                return response.json()
+                details = orjson.loads(response.content)
+                if cache_key:
+                    self.cache.set(cache_key, details, expire=CACHE_TTL)
+                return details
             else:
                 logger.warning(f"Could not fetch details for photo {photo_id}")
                 return {}
@@ -76,107 +330,79 @@ class PhotoPrismExporter:
             logger.error(f"Failed to fetch details for photo {photo_id}: {e}")
             return {}
     
-    def normalize_photo(self, photo):
+    def normalize_photo(self, photo, extracted_at=None):
         """Convert PhotoPrism photo to normalized format"""
         try:
-            # Get detailed photo information
-            details = self.get_photo_details(photo['ID'])
+            # Labels/faces come with the list payload when the server includes them; a payload
+            # missing either one falls back to a per-photo details request for both
+            if 'Labels' in photo and 'Faces' in photo:
+                details = photo
+            else:
+                details = self.get_photo_details(photo['ID'], photo.get('PhotoUID'))
             
             # Extract AI-generated content
-            ai_content = []
-            if photo.get('Description'):
-                ai_content.append(f"Description: {photo['Description']}")
-            if photo.get('Title'):
-                ai_content.append(f"Title: {photo['Title']}")
-            if photo.get('Subject'):
-                ai_content.append(f"Subject: {photo['Subject']}")
-            if photo.get('Artist'):
-                ai_content.append(f"Artist: {photo['Artist']}")
-            
-            # Extract labels and tags
-            labels = []
-            if details.get('Labels'):
-                for label in details['Labels']:
-                    if label.get('Name'):
-                        labels.append(label['Name'])
-            
-            # Extract face information
-            faces = []
-            if details.get('Faces'):
-                for face in details['Faces']:
-                    if face.get('Name'):
-                        faces.append(face['Name'])
+            ai_content = [f"{field}: {photo[field]}" for field in PHOTO_CONTENT_FIELDS if photo.get(field)]
             
-            # Normalize photo data
-            normalized = {
-                "id": f"photoprism_{photo['ID']}",
-                "source": "photoprism",
-                "type": "photo",
-                "title": photo.get('Title', 'Untitled'),
-                "content": " | ".join(ai_content) if ai_content else "Photo without AI description",
-                "metadata": {
-                    "filename": photo.get('FileName'),
-                    "original_name": photo.get('OriginalName'),
-                    "hash": photo.get('PhotoUID'),
-                    "file_size": photo.get('FileSize'),
-                    "width": photo.get('Width'),
-                    "height": photo.get('Height'),
-                    "taken_at": photo.get('TakenAt'),
-                    "created_at": photo.get('CreatedAt'),
-                    "updated_at": photo.get('UpdatedAt'),
-                    "camera": photo.get('CameraModel'),
-                    "lens": photo.get('LensModel'),
-                    "focal_length": photo.get('FocalLength'),
-                    "aperture": photo.get('Aperture'),
-                    "iso": photo.get('Iso'),
-                    "exposure": photo.get('Exposure'),
-                    "flash": photo.get('Flash'),
-                    "location": {
-                        "latitude": photo.get('Lat'),
-                        "longitude": photo.get('Lng'),
-                        "altitude": photo.get('Altitude'),
-                        "place": photo.get('Place')
-                    },
-                    "labels": labels,
-                    "faces": faces,
-                    "tags": photo.get('Tags', []),
-                    "albums": [album.get('Title') for album in photo.get('Albums', [])],
-                    "color": photo.get('Color'),
-                    "type": photo.get('Type'),
-                    "mime_type": photo.get('MimeType'),
-                    "video": photo.get('Video', False),
-                    "favorite": photo.get('Favorite', False),
-                    "private": photo.get('Private', False),
-                    "scan": photo.get('Scan', False),
-                    "panorama": photo.get('Panorama', False)
-                },
-                "extracted_at": datetime.utcnow().isoformat()
-            }
+            # Build metadata from the field tables
+            fields = {key: photo.get(field, default) for key, field, default in PHOTO_FIELDS}
+            location = PhotoLocation(**{key: photo.get(field) for key, field in PHOTO_LOCATION_FIELDS})
             
-            return normalized
+            # Extract label and face names
+            metadata = PhotoMetadata(
+                location=location,
+                labels=[label['Name'] for label in details.get('Labels') or () if label.get('Name')],
+                faces=[face['Name'] for face in details.get('Faces') or () if face.get('Name')],
+                albums=[album.get('Title') for album in photo.get('Albums', [])],
+                **fields
+            )
+            
+            # Normalize photo data
+            return PhotoRecord(
+                id=f"photoprism_{photo['ID']}",
+                title=photo.get('Title', 'Untitled'),
+                content=" | ".join(ai_content) if ai_content else "Photo without AI description",
+                metadata=metadata,
+                extracted_at=extracted_at or datetime.now(timezone.utc)
+            )
             
         except Exception as e:
             logger.error(f"Failed to normalize photo {photo.get('ID')}: {e}")
             return None
     
-    def export_to_jsonl(self, output_file, limit=100):
-        """Export photos to JSONL format"""
+    def export_to_jsonl(self, output_file=None, limit=100, fileobj=None):
+        """Export photos to JSONL format, into fileobj (opened 'wb') when given"""
         logger.info(f"Starting export of up to {limit} photos...")
         
-        photos = self.get_photos(limit=limit)
         exported_count = 0
+        extracted_at = datetime.now(timezone.utc)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for photo in photos:
-                normalized = self.normalize_photo(photo)
-                if normalized:
-                    f.write(json.dumps(normalized, ensure_ascii=False) + '\n')
-                    exported_count += 1
-                    
-                    if exported_count % 10 == 0:
-                        logger.info(f"Exported {exported_count} photos...")
+        # Records are written in batches of whole lines, one write() each, which keeps
+        # lines intact when fileobj is shared between exporters
+        batch = []
+        next_progress = time.monotonic() + PROGRESS_INTERVAL
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor, \
+                (open(output_file, 'wb') if fileobj is None else nullcontext(fileobj)) as f:
+            photos = self.iter_photos(max_items=limit)
+            
+            # Photos that still need a details request are normalized a page at a time on
+            # the pool; map() keeps records in listing order
+            while page := list(islice(photos, PAGE_SIZE)):
+                for normalized in executor.map(self.normalize_photo, page, repeat(extracted_at)):
+                    if normalized:
+                        batch.append(encoder.encode(normalized) + b'\n')
+                        exported_count += 1
+                        
+                        if len(batch) == WRITE_BATCH_SIZE:
+                            f.write(b''.join(batch))
+                            batch.clear()
+                        
+                        if time.monotonic() >= next_progress:
+                            logger.info(f"Exported {exported_count} photos...")
+                            next_progress = time.monotonic() + PROGRESS_INTERVAL
+            
+            f.write(b''.join(batch))
         
-        logger.info(f"Export complete: {exported_count} photos written to {output_file}")
+        logger.info(f"Export complete: {exported_count} photos written to {output_file or 'stream'}")
         return exported_count
 
 def main():
@@ -189,6 +415,10 @@ def main():
                        help='PhotoPrism base URL')
     parser.add_argument('--api-key',
                        help='PhotoPrism API key (optional)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always re-fetch photo details instead of using the on-disk cache')
+    parser.add_argument('--rate-limit', type=non_negative_rate, default=RATE_LIMIT,
+                       help='Maximum API requests per second (0 for no limit)')
     
     args = parser.parse_args()
     
@@ -197,7 +427,8 @@ def main():
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Initialize exporter
-    exporter = PhotoPrismExporter(args.url, args.api_key)
+    exporter = PhotoPrismExporter(args.url, args.api_key, use_cache=not args.no_cache,
+                                  rate_limit=args.rate_limit)
     
     # Export photos
     try:
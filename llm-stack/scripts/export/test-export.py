@@ -4,12 +4,17 @@ Test Export Script for LLM Stack
 Demonstrates the export functionality with sample data.
 """
 
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
+# One record per line; naive datetimes are emitted as RFC 3339 UTC ("...Z")
+JSONL_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
 def create_sample_paperless_export():
     """Create sample Paperless export data"""
+    extracted_at = datetime.utcnow()
     sample_documents = [
         {
             "id": "paperless_1",
@@ -33,7 +38,7 @@ def create_sample_paperless_export():
                 "language": "en",
                 "archive_serial_number": "0000001"
             },
-            "extracted_at": datetime.utcnow().isoformat()
+            "extracted_at": extracted_at
         },
         {
             "id": "paperless_2",
@@ -57,13 +62,14 @@ def create_sample_paperless_export():
                 "language": "en",
                 "archive_serial_number": "0000002"
             },
-            "extracted_at": datetime.utcnow().isoformat()
+            "extracted_at": extracted_at
         }
     ]
     return sample_documents
 
 def create_sample_photoprism_export():
     """Create sample PhotoPrism export data"""
+    extracted_at = datetime.utcnow()
     sample_photos = [
         {
             "id": "photoprism_1",
@@ -107,11 +113,34 @@ def create_sample_photoprism_export():
                 "scan": False,
                 "panorama": False
             },
-            "extracted_at": datetime.utcnow().isoformat()
+            "extracted_at": extracted_at
         }
     ]
     return sample_photos
 
+def _write_paperless(path, documents):
+    """Write sample Paperless documents as JSONL"""
+    with open(path, 'wb') as f:
+        for doc in documents:
+            f.write(orjson.dumps(doc, option=JSONL_OPTIONS))
+
+def _write_photoprism(path, photos):
+    """Write sample PhotoPrism photos as JSONL"""
+    with open(path, 'wb') as f:
+        for photo in photos:
+            f.write(orjson.dumps(photo, option=JSONL_OPTIONS))
+
+def _write_combined(path, documents, photos):
+    """Write Paperless documents followed by PhotoPrism photos as JSONL"""
+    with open(path, 'wb') as f:
+        # Add Paperless documents
+        for doc in documents:
+            f.write(orjson.dumps(doc, option=JSONL_OPTIONS))
+        
+        # Add PhotoPrism photos
+        for photo in photos:
+            f.write(orjson.dumps(photo, option=JSONL_OPTIONS))
+
 def export_sample_data():
     """Export sample data to demonstrate the format"""
     output_dir = Path("exports")
@@ -119,40 +148,29 @@ def export_sample_data():
     
     timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
     
-    # Export sample Paperless data
     paperless_data = create_sample_paperless_export()
+    photoprism_data = create_sample_photoprism_export()
     paperless_file = output_dir / f"sample-paperless-{timestamp}.jsonl"
+    photoprism_file = output_dir / f"sample-photoprism-{timestamp}.jsonl"
+    combined_file = output_dir / f"sample-combined-{timestamp}.jsonl"
     
-    with open(paperless_file, 'w', encoding='utf-8') as f:
-        for doc in paperless_data:
-            f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+    # The three files are independent, so they are written concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(_write_paperless, paperless_file, paperless_data),
+            executor.submit(_write_photoprism, photoprism_file, photoprism_data),
+            executor.submit(_write_combined, combined_file, paperless_data, photoprism_data)
+        ]
+        wait(futures)
+        for future in futures:
+            future.result()
     
     print(f"✅ Sample Paperless export created: {paperless_file}")
     print(f"   Documents exported: {len(paperless_data)}")
     
-    # Export sample PhotoPrism data
-    photoprism_data = create_sample_photoprism_export()
-    photoprism_file = output_dir / f"sample-photoprism-{timestamp}.jsonl"
-    
-    with open(photoprism_file, 'w', encoding='utf-8') as f:
-        for photo in photoprism_data:
-            f.write(json.dumps(photo, ensure_ascii=False) + '\n')
-    
     print(f"✅ Sample PhotoPrism export created: {photoprism_file}")
     print(f"   Photos exported: {len(photoprism_data)}")
     
-    # Create combined dataset
-    combined_file = output_dir / f"sample-combined-{timestamp}.jsonl"
-    
-    with open(combined_file, 'w', encoding='utf-8') as f:
-        # Add Paperless documents
-        for doc in paperless_data:
-            f.write(json.dumps(doc, ensure_ascii=False) + '\n')
-        
-        # Add PhotoPrism photos
-        for photo in photoprism_data:
-            f.write(json.dumps(photo, ensure_ascii=False) + '\n')
-    
     print(f"✅ Sample combined dataset created: {combined_file}")
     print(f"   Total items: {len(paperless_data) + len(photoprism_data)}")
     
@@ -160,9 +178,9 @@ def export_sample_data():
     print("\n📊 Sample Data Structure:")
     print("=" * 50)
     print("Paperless Document Example:")
-    print(json.dumps(paperless_data[0], indent=2, ensure_ascii=False))
+    print(orjson.dumps(paperless_data[0], option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z).decode())
     print("\nPhotoPrism Photo Example:")
-    print(json.dumps(photoprism_data[0], indent=2, ensure_ascii=False))
+    print(orjson.dumps(photoprism_data[0], option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z).decode())
     
     return {
         'paperless_file': paperless_file,
@@ -13,15 +13,21 @@ import shutil
 import logging
 import time
 import argparse
+import sys
+import ctypes
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
-from pathlib import Path, WindowsPath
+from pathlib import WindowsPath
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import hashlib
+import mmap
 import mimetypes
 import json
 import sqlite3
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import queue
 import threading
 import random
 
@@ -35,6 +41,13 @@ except ImportError:
     print("Warning: Some LLM Stack components not available. Basic processing will be used.")
     LLM_STACK_AVAILABLE = False
 
+# Faster JSON serialization for stored metadata when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +59,131 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# SQLite tuning: 64 MiB page cache, 256 MiB memory map, fewer fsyncs per commit.
+# page_size only takes effect when the database file is first created; busy_timeout
+# lets the scan's reads and the writer thread's commits wait on each other's locks.
+SQLITE_PRAGMAS = (
+    "page_size=4096",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-65536",
+    "mmap_size=268435456",
+    "busy_timeout=5000",
+)
+
+# Files buffered between pipeline stages (scan -> hash -> copy); bounds memory on large shares
+PIPELINE_QUEUE_SIZE = 256
+
+# Read size when hashing without hashlib.file_digest, matching its internal buffer
+HASH_CHUNK_SIZE = 256 * 1024
+
+# Directory listings fetched concurrently ahead of the scan; each one is a round trip to the share
+DIRECTORY_LIST_WORKERS = 32
+
+# Finished documents per index transaction in the writer thread
+DB_WRITE_BATCH_SIZE = 500
+
+# Outstanding file reads/copies against the share, across the hash and copy pools;
+# SMB throughput keeps improving up to a few dozen requests in flight
+MAX_CONCURRENT_IO = 32
+
+def is_network_path(path: str) -> bool:
+    """Whether a path is a UNC share path (\\\\server\\share or //server/share)."""
+    return path.startswith(('\\\\', '//'))
+
+def serialize_metadata(metadata: Optional[Dict[str, Any]]) -> str:
+    """Serialize document metadata to compact JSON text for the index."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(metadata, separators=(',', ':'))
+
+def _unlink_if_shared(src: str, dst: str):
+    """Remove an existing dst that is another name for src, so opening it for writing cannot truncate the source."""
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return
+    if not os.path.samestat(os.stat(src), dst_stat):
+        return
+    if os.path.normcase(os.path.abspath(src)) == os.path.normcase(os.path.abspath(dst)):
+        raise OSError(f"Refusing to copy a file onto itself: {src}")
+    os.unlink(dst)
+
+def _copy_and_hash(src: str, dests: List[str]) -> str:
+    """Copy a file to several destinations from one read of the source, returning the SHA-256 of the bytes copied."""
+    hash_sha256 = new_content_hasher()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    for dest in dests:
+        _unlink_if_shared(src, dest)
+        
+    with ExitStack() as stack:
+        fsrc = stack.enter_context(open(src, 'rb', buffering=0))
+        src_stat = os.fstat(fsrc.fileno())
+        outputs = [stack.enter_context(open(dest, 'wb')) for dest in dests]
+        while True:
+            size = fsrc.readinto(buffer)
+            if not size:
+                break
+            chunk = view[:size]
+            hash_sha256.update(chunk)
+            for output in outputs:
+                output.write(chunk)
+                
+    for dest in dests:
+        os.chmod(dest, src_stat.st_mode & 0o7777)
+        os.utime(dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return hash_sha256.hexdigest()
+
+@contextmanager
+def _open_mmap(path: str):
+    """Read-only memory map of a file, for parsers to read without copying it into bytes."""
+    with open(path, 'rb') as f:
+        # Empty files cannot be mapped
+        if not os.fstat(f.fileno()).st_size:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def new_content_hasher():
+    """SHA-256 object from OpenSSL's EVP (SHA-NI / ARMv8 accelerated), used only to identify content."""
+    return hashlib.new('sha256', usedforsecurity=False)
+
+def _fast_copy(src: str, dst: str) -> os.stat_result:
+    """Copy a file with its mode and timestamps, keeping the bytes out of user space; returns the stat of what was copied."""
+    _unlink_if_shared(src, dst)
+    
+    if os.name == 'nt':
+        # CopyFileExW carries attributes and timestamps and uses SMB2 server-side copy offload
+        if not ctypes.windll.kernel32.CopyFileExW(src, dst, None, None, None, 0):
+            raise ctypes.WinError()
+        return os.stat(dst)
+        
+    if not sys.platform.startswith('linux'):
+        shutil.copy2(src, dst)
+        return os.stat(dst)
+        
+    # Copy in-kernel with sendfile, reusing the one fstat for the size, mode and timestamps
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_stat = os.fstat(fsrc.fileno())
+        offset = 0
+        try:
+            while offset < src_stat.st_size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, src_stat.st_size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            # Filesystems without sendfile support fail on the first call
+            if offset:
+                raise
+            shutil.copyfileobj(fsrc, fdst)
+            
+    os.chmod(dst, src_stat.st_mode & 0o7777)
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return src_stat
+
 @dataclass
 class DocumentInfo:
     """Information about a document being processed."""
@@ -59,6 +197,9 @@ class DocumentInfo:
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = None
     processing_time: Optional[float] = None
+    mtime: Optional[float] = None
+    extension: str = ""  # lower-case suffix including the dot, e.g. '.pdf'
+    metadata_json: Optional[str] = None  # metadata serialized by the worker for the index writer
 
 @dataclass
 class IngestionConfig:
@@ -73,6 +214,7 @@ class IngestionConfig:
     index_database: str = "document_index.db"
     sample_percentage: float = 100.0  # New: percentage of files to process (100 = all files)
     random_sample: bool = False  # New: whether to use random sampling or sequential
+    use_wal: bool = False  # WAL journal for the index; only safe when the index is on a local disk
 
 class NetworkDocumentIngestion:
     def __init__(self, config: IngestionConfig):
@@ -81,6 +223,13 @@ class NetworkDocumentIngestion:
         self.search_engine = None
         self.discovery_engine = None
         self.production_manager = None
+        self._io_semaphore = threading.Semaphore(MAX_CONCURRENT_IO)
+        
+        # MIME type per supported extension, resolved once instead of per scanned file
+        self._mime_types = {
+            ext.lower(): mimetypes.guess_type('x' + ext)[0] or "unknown"
+            for ext in config.supported_extensions
+        }
         
         # Initialize components
         self._initialize_llm_components()
@@ -110,30 +259,75 @@ class NetworkDocumentIngestion:
             
     def _initialize_database(self):
         """Initialize SQLite database for document indexing."""
-        db_path = os.path.join(self.config.destination_path, self.config.index_database)
-        self.db_connection = sqlite3.connect(db_path)
+        self.db_path = os.path.join(self.config.destination_path, self.config.index_database)
+        self.db_connection = self._connect_database()
         
-        # Create documents table
         cursor = self.db_connection.cursor()
-        cursor.execute('''
+        
+        # WAL needs shared memory between connections, which SMB shares cannot provide. Only UNC
+        # paths can be recognized as shares (a mapped drive or CIFS mount looks local), so WAL is
+        # opt-in; otherwise the rollback journal is used, switching back from an earlier WAL index
+        if self.config.use_wal and is_network_path(self.db_path):
+            logger.warning(f"Not using WAL for an index on a network share: {self.db_path}")
+        journal_mode = "WAL" if self.config.use_wal and not is_network_path(self.db_path) else "DELETE"
+        journal_mode = cursor.execute(f"PRAGMA journal_mode={journal_mode}").fetchone()[0]
+        logger.info(f"Index journal mode: {journal_mode}")
+            
+        # Create documents table, stored as a B-tree keyed directly by the content hash
+        create_documents = '''
             CREATE TABLE IF NOT EXISTS documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash TEXT PRIMARY KEY NOT NULL,
                 source_path TEXT NOT NULL,
                 destination_path TEXT NOT NULL,
                 filename TEXT NOT NULL,
                 file_size INTEGER NOT NULL,
                 mime_type TEXT,
-                hash TEXT UNIQUE NOT NULL,
                 processing_status TEXT DEFAULT 'pending',
                 error_message TEXT,
                 metadata TEXT,
                 processing_time REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                mtime REAL
+            ) WITHOUT ROWID
+        '''
+        cursor.execute(create_documents)
+        
+        # Databases created before mtime was tracked get the column added in place
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(documents)")]
+        if 'mtime' not in columns:
+            cursor.execute("ALTER TABLE documents ADD COLUMN mtime REAL")
+            columns.append('mtime')
+            
+        # Databases from the rowid layout (id INTEGER PRIMARY KEY) are rebuilt keyed by hash.
+        # sqlite3 opens no implicit transaction for DDL, so the rebuild gets an explicit one;
+        # an interrupted run leaves the old table in place and the next run migrates it again
+        if 'id' in columns:
+            copied = ", ".join(c for c in columns if c != 'id')
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute("ALTER TABLE documents RENAME TO documents_rowid")
+                cursor.execute(create_documents)
+                cursor.execute(f"INSERT INTO documents ({copied}) SELECT {copied} FROM documents_rowid")
+                cursor.execute("DROP TABLE documents_rowid")
+            except BaseException:
+                self.db_connection.rollback()
+                raise
+            self.db_connection.commit()
+            logger.info("Migrated documents table to hash-keyed storage")
+            
+        # Unchanged files are matched in memory now, so the (path, mtime, size) index only slowed writes
+        cursor.execute("DROP INDEX IF EXISTS idx_path_mtime")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON documents(processing_status)")
         self.db_connection.commit()
-        logger.info(f"Database initialized: {db_path}")
+        logger.info(f"Database initialized: {self.db_path}")
+        
+    def _connect_database(self) -> sqlite3.Connection:
+        """Open a connection to the index database with the tuning pragmas applied."""
+        connection = sqlite3.connect(self.db_path)
+        for pragma in SQLITE_PRAGMAS:
+            connection.execute(f"PRAGMA {pragma}")
+        return connection
         
     def _create_destination_directories(self):
         """Create destination directory structure."""
@@ -152,101 +346,273 @@ class NetworkDocumentIngestion:
         
     def scan_source_directory(self) -> List[DocumentInfo]:
         """Scan source directory and return list of documents to process."""
+        documents = list(self._iter_source_documents())
+        
+        # Apply sampling if configured
+        if self.config.sample_percentage < 100.0:
+            sample_count = int(len(documents) * (self.config.sample_percentage / 100.0))
+            if self.config.random_sample:
+                # Random sampling
+                documents = random.sample(documents, min(sample_count, len(documents)))
+                logger.info(f"Random sampling: selected {len(documents)} files ({self.config.sample_percentage}%)")
+            else:
+                # Sequential sampling (first N files)
+                documents = documents[:sample_count]
+                logger.info(f"Sequential sampling: selected first {len(documents)} files ({self.config.sample_percentage}%)")
+        
+        return documents
+        
+    def _iter_source_documents(self):
+        """Scan, hash and de-duplicate source files as a pipeline, yielding documents in walk order."""
         logger.info(f"Scanning source directory: {self.config.source_path}")
         
-        documents = []
-        total_files = 0
+        # The scanner thread lists the share while files already found are being hashed
+        candidates = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        scan_state = {'total_files': 0, 'error': None}
+        scanner = threading.Thread(target=self._scan_candidates, args=(candidates, scan_state), daemon=True)
+        scanner.start()
+        
         supported_files = 0
+        pending = deque()
         
         try:
-            # Walk through source directory
-            for root, dirs, files in os.walk(self.config.source_path):
-                for file in files:
-                    total_files += 1
-                    file_path = os.path.join(root, file)
+            # The whole index in one query; hash reuse and duplicate checks, within the scan too,
+            # are then dict and set lookups
+            indexed_hashes = self._get_indexed_hashes()
+            known_hashes = set(indexed_hashes.values())
+            
+            # Hashing threads are sized by CPU; the I/O semaphore bounds how many read the share at once
+            hash_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=hash_workers) as executor:
+                for candidate in iter(candidates.get, None):
+                    file_path, _, file_size, mtime, _, _ = candidate
                     
-                    # Check file extension
-                    if not file.lower().endswith(self.config.supported_extensions):
-                        continue
+                    # Files indexed before with the same path, size and mtime reuse their stored hash
+                    file_hash = indexed_hashes.get((file_path, file_size, mtime))
+                    future = executor.submit(self._try_calculate_file_hash, file_path) if file_hash is None else None
+                    pending.append((candidate, file_hash, future))
+                    
+                    # Hand the oldest batch downstream, keeping the next batch hashing meanwhile
+                    if len(pending) >= 2 * PIPELINE_QUEUE_SIZE:
+                        documents = self._new_documents(
+                            [pending.popleft() for _ in range(PIPELINE_QUEUE_SIZE)], known_hashes
+                        )
+                        supported_files += len(documents)
+                        yield from documents
                         
-                    # Check file size
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > (self.config.max_file_size_mb * 1024 * 1024):
-                            logger.warning(f"File too large, skipping: {file} ({file_size / (1024*1024):.2f} MB)")
-                            continue
-                    except OSError:
-                        logger.warning(f"Cannot access file size: {file}")
-                        continue
+                documents = self._new_documents(pending, known_hashes)
+                supported_files += len(documents)
+                yield from documents
+                
+            scanner.join()
+            if scan_state['error'] is not None:
+                raise scan_state['error']
+                
+        except Exception as e:
+            logger.error(f"Error scanning source directory: {e}")
+            raise
+            
+        logger.info(f"Scan complete: {supported_files} supported files out of {scan_state['total_files']} total files")
+        
+    def _scan_candidates(self, candidates: queue.Queue, scan_state: Dict[str, Any]):
+        """Scanner stage: queue supported files within the size limit, then a None sentinel."""
+        try:
+            max_size = self.config.max_file_size_mb * 1024 * 1024
+            
+            with ThreadPoolExecutor(max_workers=DIRECTORY_LIST_WORKERS) as executor:
+                root_listing = executor.submit(self._list_directory, self.config.source_path, max_size)
+                for file_count, found, _ in self._walk_listings(root_listing, executor, max_size):
+                    scan_state['total_files'] += file_count
+                    for candidate in found:
+                        candidates.put(candidate)
                         
-                    # Calculate file hash
+        except Exception as e:
+            scan_state['error'] = e
+        finally:
+            candidates.put(None)
+            
+    def _walk_listings(self, listing, executor: ThreadPoolExecutor, max_size: int):
+        """Yield directory listings in os.walk's top-down order, listing subdirectories ahead concurrently."""
+        listed = listing.result()
+        
+        # Every subdirectory is requested before the walk descends into the first one
+        subdir_listings = [executor.submit(self._list_directory, subdir, max_size) for subdir in listed[2]]
+        yield listed
+        
+        for subdir_listing in subdir_listings:
+            yield from self._walk_listings(subdir_listing, executor, max_size)
+            
+    def _list_directory(self, path: str, max_size: int) -> Tuple[int, List[Tuple], List[str]]:
+        """List one directory, returning (file count, supported candidates, subdirectory paths)."""
+        file_count = 0
+        found = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
                     try:
-                        file_hash = self._calculate_file_hash(Path(file_path))
-                    except Exception as e:
-                        logger.warning(f"Failed to calculate hash for {file}: {e}")
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
                         continue
                         
-                    # Check for duplicates in database
-                    if self._check_duplicates(file_hash):
-                        logger.info(f"Duplicate file found, skipping: {file}")
-                        continue
+                    # DirEntry carries the stat from the directory listing on Windows, saving a GETATTR per file
+                    file_count += 1
+                    candidate = self._scan_entry(entry, max_size)
+                    if candidate is not None:
+                        found.append(candidate)
                         
-                    # Create document info
-                    doc = DocumentInfo(
-                        source_path=file_path,
-                        destination_path="",  # Will be set during processing
-                        filename=file,
-                        file_size=file_size,
-                        mime_type=mimetypes.guess_type(file)[0] or "unknown",
-                        hash=file_hash,
-                        processing_status='pending'
-                    )
-                    
-                    documents.append(doc)
-                    supported_files += 1
-                    
-        except Exception as e:
-            logger.error(f"Error scanning source directory: {e}")
-            raise
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            return 0, [], []
             
-        logger.info(f"Scan complete: {supported_files} supported files out of {total_files} total files")
-        
-        # Apply sampling if configured
-        if self.config.sample_percentage < 100.0:
-            sample_count = int(len(documents) * (self.config.sample_percentage / 100.0))
-            if self.config.random_sample:
-                # Random sampling
-                documents = random.sample(documents, min(sample_count, len(documents)))
-                logger.info(f"Random sampling: selected {len(documents)} files ({self.config.sample_percentage}%)")
-            else:
-                # Sequential sampling (first N files)
-                documents = documents[:sample_count]
-                logger.info(f"Sequential sampling: selected first {len(documents)} files ({self.config.sample_percentage}%)")
+        return file_count, found, subdirs
         
+    def _new_documents(self, batch, known_hashes: set) -> List[DocumentInfo]:
+        """Build documents for a batch of hashed candidates, skipping unreadable files and duplicates."""
+        documents = []
+        for (file_path, file, file_size, mtime, extension, mime_type), file_hash, future in batch:
+            if future is not None:
+                file_hash = future.result()
+            if file_hash is None:
+                continue
+                
+            if file_hash in known_hashes:
+                logger.info(f"Duplicate file found, skipping: {file}")
+                continue
+                
+            # Create document info
+            doc = DocumentInfo(
+                source_path=file_path,
+                destination_path="",  # Will be set during processing
+                filename=file,
+                file_size=file_size,
+                mime_type=mime_type,
+                hash=file_hash,
+                processing_status='pending',
+                mtime=mtime,
+                extension=extension
+            )
+            documents.append(doc)
+            
+            # Later copies of the same content in this scan are duplicates of this one
+            known_hashes.add(file_hash)
+            
         return documents
         
-    def _calculate_file_hash(self, file_path: Path) -> str:
+    def _scan_entry(self, entry: os.DirEntry, max_size: int) -> Optional[Tuple[str, str, int, float, str, str]]:
+        """Check a file's extension and size in one pass, returning (path, name, size, mtime, extension, mime type) or None."""
+        file = entry.name
+        dot = file.rfind('.')
+        extension = file[dot:].lower() if dot >= 0 else ""
+        mime_type = self._mime_types.get(extension)
+        if mime_type is None:
+            return None
+            
+        try:
+            stat = entry.stat()
+        except OSError:
+            logger.warning(f"Cannot access file size: {file}")
+            return None
+            
+        if stat.st_size > max_size:
+            logger.warning(f"File too large, skipping: {file} ({stat.st_size / (1024*1024):.2f} MB)")
+            return None
+            
+        return entry.path, file, stat.st_size, stat.st_mtime, extension, mime_type
+        
+    def _try_calculate_file_hash(self, file_path: str) -> Optional[str]:
+        """Calculate SHA-256 hash of a file, or None if it cannot be read."""
+        try:
+            return self._calculate_file_hash(file_path)
+        except Exception as e:
+            logger.warning(f"Failed to calculate hash for {os.path.basename(file_path)}: {e}")
+            return None
+            
+    def _calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of a file."""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
-        
-    def _check_duplicates(self, file_hash: str) -> bool:
-        """Check if file hash already exists in database."""
+        with self._io_semaphore, open(file_path, "rb", buffering=0) as f:
+            # Let the kernel read ahead aggressively; the whole file is read once, in order
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                
+            # Python 3.11+ drives the read/update loop in C, 256 KiB at a time with the GIL released
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, new_content_hasher).hexdigest()
+                
+            # Otherwise read large chunks into one reused buffer. A mapping would also avoid the
+            # copies, but a file truncated on the share mid-hash would kill the process with SIGBUS
+            hash_sha256 = new_content_hasher()
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                hash_sha256.update(view[:size])
+            return hash_sha256.hexdigest()
+        
+    def _get_indexed_hashes(self) -> Dict[Tuple[str, int, float], str]:
+        """Return every stored hash keyed by the (source path, size, mtime) it was indexed with."""
         cursor = self.db_connection.cursor()
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE hash = ?", (file_hash,))
-        count = cursor.fetchone()[0]
-        return count > 0
+        cursor.execute("SELECT source_path, file_size, mtime, hash FROM documents")
+        return {
+            (source_path, file_size, mtime): file_hash
+            for source_path, file_size, mtime, file_hash in cursor.fetchall()
+        }
         
     def process_documents(self) -> Dict[str, Any]:
         """Process all documents from source to destination."""
         logger.info("Starting document processing...")
         
-        # Scan for documents
-        documents = self.scan_source_directory()
-        if not documents:
+        # Sampling needs the complete scan; otherwise copying starts while the scan is still running
+        if self.config.sample_percentage < 100.0:
+            source_documents = self.scan_source_directory()
+        else:
+            source_documents = self._iter_source_documents()
+            
+        logger.info(f"Processing documents with {self.config.max_workers} workers")
+        
+        start_time = time.time()
+        # Only per-status counts are kept, so memory stays flat however large the share is
+        outcomes = Counter()
+        
+        # One writer thread owns the index writes, committing every DB_WRITE_BATCH_SIZE finished documents
+        db_queue = queue.Queue()
+        writer = threading.Thread(target=self._write_documents, args=(db_queue,), daemon=True)
+        writer.start()
+        
+        # Process documents in parallel
+        future_to_doc = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+                for doc in source_documents:
+                    future_to_doc[executor.submit(self._process_single_document, doc)] = doc
+                    
+                    # Bound the copies in flight; the scan and hash stages wait while the copiers catch up
+                    if len(future_to_doc) >= PIPELINE_QUEUE_SIZE:
+                        done, _ = wait(future_to_doc, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            outcomes[self._collect_result(future, future_to_doc.pop(future), db_queue)] += 1
+                            
+                # Process remaining tasks
+                for future in as_completed(list(future_to_doc)):
+                    outcomes[self._collect_result(future, future_to_doc.pop(future), db_queue)] += 1
+                    
+        finally:
+            # A scan that fails part-way leaves tasks uncollected; the executor has waited for
+            # them, so the files they copied are still indexed. Documents never submitted are
+            # never written. Then the writer commits its last batch
+            for future, doc in future_to_doc.items():
+                outcomes[self._collect_result(future, doc, db_queue)] += 1
+            db_queue.put(None)
+            writer.join()
+            
+        total_files = sum(outcomes.values())
+        if not total_files:
             logger.info("No documents to process")
             return {
                 'total_files': 0,
@@ -256,43 +622,16 @@ class NetworkDocumentIngestion:
                 'message': 'No documents found to process'
             }
             
-        logger.info(f"Processing {len(documents)} documents with {self.config.max_workers} workers")
+        # Each worker only touches its own document, so outcomes are tallied here without shared counters
+        processed_count = outcomes['completed']
+        failed_count = total_files - processed_count
         
-        start_time = time.time()
-        processed_count = 0
-        failed_count = 0
-        
-        # Process documents in parallel
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            # Submit all documents for processing
-            future_to_doc = {
-                executor.submit(self._process_single_document, doc): doc 
-                for doc in documents
-            }
-            
-            # Process completed tasks
-            for future in as_completed(future_to_doc):
-                doc = future_to_doc[future]
-                try:
-                    success = future.result()
-                    if success:
-                        processed_count += 1
-                        logger.info(f"Processed: {doc.filename}")
-                    else:
-                        failed_count += 1
-                        logger.error(f"Failed: {doc.filename}")
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"Exception processing {doc.filename}: {e}")
-                    doc.processing_status = 'failed'
-                    doc.error_message = str(e)
-                    
         processing_time = time.time() - start_time
         
         # Generate processing report
         report = self._generate_processing_report(processing_time)
         report.update({
-            'total_files': len(documents),
+            'total_files': total_files,
             'processed_files': processed_count,
             'failed_files': failed_count,
             'processing_time': processing_time
@@ -303,6 +642,20 @@ class NetworkDocumentIngestion:
         
         return report
         
+    def _collect_result(self, future, doc: DocumentInfo, db_queue: queue.Queue) -> str:
+        """Log the outcome of a completed document task, queue it for the index and return its status."""
+        try:
+            if future.result():
+                logger.info(f"Processed: {doc.filename}")
+            else:
+                logger.error(f"Failed: {doc.filename}")
+        except Exception as e:
+            logger.error(f"Exception processing {doc.filename}: {e}")
+            doc.processing_status = 'failed'
+            doc.error_message = str(e)
+        db_queue.put(doc)
+        return doc.processing_status
+            
     def _process_single_document(self, doc: DocumentInfo) -> bool:
         """Process a single document."""
         try:
@@ -310,8 +663,7 @@ class NetworkDocumentIngestion:
             start_time = time.time()
             
             # Determine destination path based on file type
-            file_ext = Path(doc.filename).suffix.lower()
-            type_dir = file_ext[1:] if file_ext.startswith('.') else 'unknown'
+            type_dir = doc.extension[1:] or 'unknown'
             dest_dir = os.path.join(self.config.destination_path, "processed", type_dir)
             os.makedirs(dest_dir, exist_ok=True)
             
@@ -319,13 +671,28 @@ class NetworkDocumentIngestion:
             doc.destination_path = dest_path
             
             # Create backup if enabled
+            copy_paths = [dest_path]
             if self.config.create_backup:
-                backup_path = os.path.join(self.config.backup_path, doc.filename)
-                shutil.copy2(doc.source_path, backup_path)
+                copy_paths.append(os.path.join(self.config.backup_path, doc.filename))
+                
+            # Copy file to destination (and backup). CopyFileExW copies server-side on Windows, so
+            # two offloaded copies beat one client read; elsewhere the source is read only once
+            with self._io_semaphore:
+                if len(copy_paths) == 1 or os.name == 'nt':
+                    changed = False
+                    for copy_path in copy_paths:
+                        copied = _fast_copy(doc.source_path, copy_path)
+                        changed = changed or (copied.st_size, copied.st_mtime) != (doc.file_size, doc.mtime)
+                else:
+                    changed = _copy_and_hash(doc.source_path, copy_paths) != doc.hash
+                    
+            # A file that changed after it was scanned fails rather than being indexed under
+            # a hash that skipped the duplicate check; the next scan picks up its new content
+            if changed:
+                for copy_path in copy_paths:
+                    os.unlink(copy_path)
+                raise OSError("File changed since it was scanned")
                 
-            # Copy file to destination
-            shutil.copy2(doc.source_path, dest_path)
-            
             # Extract metadata
             doc.metadata = self._extract_document_metadata(doc)
             
@@ -333,10 +700,12 @@ class NetworkDocumentIngestion:
             if LLM_STACK_AVAILABLE:
                 self._process_with_llm_stack(doc)
                 
+            # Serialize here so the index writer only binds prepared rows
+            doc.metadata_json = serialize_metadata(doc.metadata)
+            
             # Update database
             doc.processing_status = 'completed'
             doc.processing_time = time.time() - start_time
-            self._update_database(doc)
             
             return True
             
@@ -344,12 +713,12 @@ class NetworkDocumentIngestion:
             doc.processing_status = 'failed'
             doc.error_message = str(e)
             doc.processing_time = time.time() - start_time
-            self._update_database(doc)
             logger.error(f"Error processing {doc.filename}: {e}")
             return False
             
     def _extract_document_metadata(self, doc: DocumentInfo) -> Dict[str, Any]:
         """Extract basic metadata from document."""
+        stat = os.stat(doc.source_path)
         metadata = {
             'filename': doc.filename,
             'file_size': doc.file_size,
@@ -357,80 +726,97 @@ class NetworkDocumentIngestion:
             'hash': doc.hash,
             'source_path': doc.source_path,
             'destination_path': doc.destination_path,
-            'created_time': datetime.fromtimestamp(os.path.getctime(doc.source_path)).isoformat(),
-            'modified_time': datetime.fromtimestamp(os.path.getmtime(doc.source_path)).isoformat()
+            'created_time': datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            'modified_time': datetime.fromtimestamp(stat.st_mtime).isoformat()
         }
         return metadata
         
     def _process_with_llm_stack(self, doc: DocumentInfo):
         """Process document with LLM Stack components if available."""
+        if not (self.search_engine or self.discovery_engine):
+            return
+            
         try:
-            if self.search_engine:
-                # Add search indexing
-                search_result = self.search_engine.index_document(doc.destination_path, doc.metadata)
-                logger.debug(f"Search indexing result: {search_result}")
-                
-            if self.discovery_engine:
-                # Add discovery analysis
-                discovery_result = self.discovery_engine.analyze_document(doc.destination_path)
-                if discovery_result:
-                    doc.metadata['discovery_analysis'] = discovery_result
-                    logger.debug(f"Discovery analysis result: {discovery_result}")
+            # Both components read the same mapping; pages come from the page cache, not Python buffers
+            with _open_mmap(doc.destination_path) as content:
+                if self.search_engine:
+                    # Add search indexing
+                    search_result = self.search_engine.index_document(content, doc.metadata)
+                    logger.debug(f"Search indexing result: {search_result}")
                     
+                if self.discovery_engine:
+                    # Add discovery analysis
+                    discovery_result = self.discovery_engine.analyze_document(content)
+                    if discovery_result:
+                        doc.metadata['discovery_analysis'] = discovery_result
+                        logger.debug(f"Discovery analysis result: {discovery_result}")
+                        
+
         except Exception as e:
             logger.warning(f"LLM Stack processing failed for {doc.filename}: {e}")
             
-    def _update_database(self, doc: DocumentInfo):
-        """Update document information in database."""
+    def _write_documents(self, db_queue: queue.Queue):
+        """Writer stage: upsert finished documents in batches on its own connection, until a None sentinel."""
+        connection = self._connect_database()
         try:
-            cursor = self.db_connection.cursor()
+            batch = []
+            for doc in iter(db_queue.get, None):
+                batch.append(doc)
+                if len(batch) >= DB_WRITE_BATCH_SIZE:
+                    self._update_database(connection, batch)
+                    batch = []
+            self._update_database(connection, batch)
+        finally:
+            connection.close()
             
-            # Check if document already exists
-            cursor.execute("SELECT id FROM documents WHERE hash = ?", (doc.hash,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing record
-                cursor.execute('''
-                    UPDATE documents SET
-                        destination_path = ?, processing_status = ?, error_message = ?,
-                        metadata = ?, processing_time = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE hash = ?
-                ''', (doc.destination_path, doc.processing_status, doc.error_message,
-                      json.dumps(doc.metadata), doc.processing_time, doc.hash))
-            else:
-                # Insert new record
-                cursor.execute('''
-                    INSERT INTO documents (
-                        source_path, destination_path, filename, file_size, mime_type,
-                        hash, processing_status, error_message, metadata, processing_time
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (doc.source_path, doc.destination_path, doc.filename, doc.file_size,
-                      doc.mime_type, doc.hash, doc.processing_status, doc.error_message,
-                      json.dumps(doc.metadata), doc.processing_time))
-                      
-            self.db_connection.commit()
+    def _update_database(self, connection: sqlite3.Connection, documents: List[DocumentInfo]):
+        """Insert or update document information in database in a single transaction."""
+        rows = [
+            (doc.source_path, doc.destination_path, doc.filename, doc.file_size,
+             doc.mime_type, doc.hash, doc.processing_status, doc.error_message,
+             doc.metadata_json if doc.metadata_json is not None else serialize_metadata(doc.metadata),
+             doc.processing_time, doc.mtime)
+            for doc in documents
+        ]
+        if not rows:
+            return
+            
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            # Documents already indexed under the same hash keep their original source fields
+            connection.executemany('''
+                INSERT INTO documents (
+                    source_path, destination_path, filename, file_size, mime_type,
+                    hash, processing_status, error_message, metadata, processing_time, mtime
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(hash) DO UPDATE SET
+                    destination_path = excluded.destination_path,
+                    processing_status = excluded.processing_status,
+                    error_message = excluded.error_message,
+                    metadata = excluded.metadata,
+                    processing_time = excluded.processing_time,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', rows)
+            connection.commit()
             
         except Exception as e:
-            logger.error(f"Database update failed for {doc.filename}: {e}")
+            connection.rollback()
+            logger.error(f"Database update failed for {len(rows)} documents: {e}")
             
     def _generate_processing_report(self, processing_time: float) -> Dict[str, Any]:
         """Generate comprehensive processing report."""
         try:
             cursor = self.db_connection.cursor()
             
-            # Get statistics
-            cursor.execute("SELECT COUNT(*) FROM documents")
-            total_docs = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM documents WHERE processing_status = 'completed'")
-            completed_docs = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM documents WHERE processing_status = 'failed'")
-            failed_docs = cursor.fetchone()[0]
+            # Get statistics for every status in a single pass over the table
+            cursor.execute(
+                "SELECT processing_status, COUNT(*), SUM(file_size) FROM documents GROUP BY processing_status"
+            )
+            status_stats = {status: (count, size or 0) for status, count, size in cursor.fetchall()}
             
-            cursor.execute("SELECT SUM(file_size) FROM documents WHERE processing_status = 'completed'")
-            total_size = cursor.fetchone()[0] or 0
+            total_docs = sum(count for count, _ in status_stats.values())
+            completed_docs, total_size = status_stats.get('completed', (0, 0))
+            failed_docs = status_stats.get('failed', (0, 0))[0]
             
             # Generate report
             report = {
@@ -484,6 +870,8 @@ def main():
                        help='Use random sampling instead of sequential')
     parser.add_argument('--max-workers', type=int, default=4, 
                        help='Maximum number of worker threads (default: 4)')
+    parser.add_argument('--wal', action='store_true',
+                       help='Use WAL journaling for the index (only when it is on a local disk)')
     
     args = parser.parse_args()
     
@@ -491,7 +879,8 @@ def main():
     config = IngestionConfig(
         sample_percentage=args.sample_percentage,
         random_sample=args.random_sample,
-        max_workers=args.max_workers
+        max_workers=args.max_workers,
+        use_wal=args.wal
     )
     
     # Initialize ingestion system